@@ -1,12 +1,50 @@
+"""
+    Esse código valida o token JWT das rotas autenticadas. Tokens já
+verificados ficam em cache (pelo hash do token) até o `exp`, e o registro
+do usuário fica em cache por alguns segundos (AUTH_USER_CACHE_TTL): várias
+chamadas seguidas do painel fazem no máximo uma consulta ao banco.
+"""
+import hashlib
+import time
+from typing import Any, Dict
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from .config import settings
 from ..db.prisma import get_prisma
+from ..services.cache import TTLCache
 from prisma import Prisma
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+_claims = TTLCache(maxsize=settings.token_cache_size, ttl=settings.access_token_expire_minutes * 60)
+_users = TTLCache(maxsize=settings.auth_user_cache_size, ttl=settings.auth_user_cache_ttl)
+
+
+def decode_token(token: str) -> Dict[str, Any]:
+    """
+    Claims do token, verificando assinatura e expiração só na primeira vez.
+
+    Raises:
+        JWTError: token inválido ou expirado
+    """
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    claims = _claims.get(key)
+    if claims is not None:
+        return claims
+
+    claims = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    expires_in = claims.get("exp", 0) - time.time()
+    if expires_in > 0:
+        _claims.set(key, claims, ttl=expires_in)
+    return claims
+
+
+def invalidate_user_cache(user_id: str) -> None:
+    """Remove o usuário do cache (ex.: após edição ou exclusão)"""
+    _users.pop(user_id)
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     prisma: Prisma = Depends(get_prisma)
@@ -17,14 +55,17 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        payload = decode_token(token)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
         
-    user = await prisma.users.find_unique(where={"id": user_id})
+    user = await _users.get_or_load(
+        user_id,
+        lambda: prisma.users.find_unique(where={"id": user_id})
+    )
     if user is None:
         raise credentials_exception
-    return user 
\ No newline at end of file
+    return user 
@@ -5,6 +5,14 @@ from functools import lru_cache
 class Settings(BaseSettings):
     # Database
     database_url: str = config('DATABASE_URL')
+    db_pool_size: int = config('DB_POOL_SIZE', default=10, cast=int)
+    db_pool_timeout: int = config('DB_POOL_TIMEOUT', default=10, cast=int)
+    db_connect_timeout: int = config('DB_CONNECT_TIMEOUT', default=10, cast=int)
+    db_query_timeout: float = config('DB_QUERY_TIMEOUT', default=30, cast=float)
+    db_connect_retries: int = config('DB_CONNECT_RETRIES', default=3, cast=int)
+    db_connect_retry_delay: float = config('DB_CONNECT_RETRY_DELAY', default=1, cast=float)
+    db_slow_query_ms: float = config('DB_SLOW_QUERY_MS', default=200, cast=float)
+    db_query_warn_threshold: int = config('DB_QUERY_WARN_THRESHOLD', default=10, cast=int)
     
     # WhatsApp
     whatsapp_service_url: str = config('whatsapp_service_url')
@@ -25,6 +33,68 @@ class Settings(BaseSettings):
     # Webhook
     webhook_url: str = config('WEBHOOK_URL')
     
+    # Pagination
+    transactions_page_size: int = config('TRANSACTIONS_PAGE_SIZE', default=100, cast=int)
+    transactions_max_page_size: int = config('TRANSACTIONS_MAX_PAGE_SIZE', default=500, cast=int)
+    statement_page_size: int = config('STATEMENT_PAGE_SIZE', default=10, cast=int)
+    statement_cursor_ttl: int = config('STATEMENT_CURSOR_TTL', default=600, cast=int)
+    
+    # Webhook
+    webhook_batch_max_size: int = config('WEBHOOK_BATCH_MAX_SIZE', default=500, cast=int)
+    webhook_batch_concurrency: int = config('WEBHOOK_BATCH_CONCURRENCY', default=8, cast=int)
+    
+    # Import
+    import_chunk_size: int = config('IMPORT_CHUNK_SIZE', default=1000, cast=int)
+    
+    # Cache
+    financial_context_cache_ttl: int = config('FINANCIAL_CONTEXT_CACHE_TTL', default=300, cast=int)
+    category_cache_size: int = config('CATEGORY_CACHE_SIZE', default=10000, cast=int)
+    category_cache_ttl: int = config('CATEGORY_CACHE_TTL', default=3600, cast=int)
+    identity_cache_size: int = config('IDENTITY_CACHE_SIZE', default=10000, cast=int)
+    identity_cache_ttl: int = config('IDENTITY_CACHE_TTL', default=300, cast=int)
+    identity_negative_ttl: int = config('IDENTITY_NEGATIVE_TTL', default=30, cast=int)
+    token_cache_size: int = config('TOKEN_CACHE_SIZE', default=10000, cast=int)
+    auth_user_cache_size: int = config('AUTH_USER_CACHE_SIZE', default=10000, cast=int)
+    auth_user_cache_ttl: int = config('AUTH_USER_CACHE_TTL', default=30, cast=int)
+    
+    # Execução de funções bloqueantes / bulkheads
+    blocking_executor_workers: int = config('BLOCKING_EXECUTOR_WORKERS', default=8, cast=int)
+    bulkhead_default_limit: int = config('BULKHEAD_DEFAULT_LIMIT', default=10, cast=int)
+    
+    # Senhas (bcrypt) e limite de tentativas
+    bcrypt_rounds: int = config('BCRYPT_ROUNDS', default=12, cast=int)
+    password_hash_workers: int = config('PASSWORD_HASH_WORKERS', default=2, cast=int)
+    password_hash_max_queue: int = config('PASSWORD_HASH_MAX_QUEUE', default=32, cast=int)
+    password_hash_timeout: float = config('PASSWORD_HASH_TIMEOUT', default=10, cast=float)
+    login_rate_limit: int = config('LOGIN_RATE_LIMIT', default=5, cast=int)
+    auth_ip_rate_limit: int = config('AUTH_IP_RATE_LIMIT', default=30, cast=int)
+    auth_rate_window: int = config('AUTH_RATE_WINDOW', default=60, cast=int)
+    
+    # IA (conselhos financeiros)
+    claude_api_key: str = config('CLAUDE_API_KEY', default='')
+    claude_base_url: str = config('CLAUDE_BASE_URL', default='')
+    claude_model: str = config('CLAUDE_MODEL', default='claude-3-opus-20240229')
+    advice_max_tokens: int = config('ADVICE_MAX_TOKENS', default=1000, cast=int)
+    advice_timeout: float = config('ADVICE_TIMEOUT', default=30, cast=float)
+    advice_max_retries: int = config('ADVICE_MAX_RETRIES', default=1, cast=int)
+    advice_concurrency: int = config('ADVICE_CONCURRENCY', default=4, cast=int)
+    advice_cache_size: int = config('ADVICE_CACHE_SIZE', default=10000, cast=int)
+    advice_cache_ttl: int = config('ADVICE_CACHE_TTL', default=3600, cast=int)
+    
+    # Health checks
+    health_cache_ttl: float = config('HEALTH_CACHE_TTL', default=5, cast=float)
+    health_probe_timeout: float = config('HEALTH_PROBE_TIMEOUT', default=2, cast=float)
+    
+    # Timezone
+    default_timezone: str = config('DEFAULT_TIMEZONE', default='America/Sao_Paulo')
+    
+    # Logs
+    log_level: str = config('LOG_LEVEL', default='INFO')
+    log_sample_rate: float = config('LOG_SAMPLE_RATE', default=1.0, cast=float)
+    log_queue_size: int = config('LOG_QUEUE_SIZE', default=10000, cast=int)
+    # Arquivo com os erros (relativo ao diretório atual); vazio desliga
+    log_error_file: str = config('LOG_ERROR_FILE', default='error_logs.txt')
+    
     # Environment
     environment: str = config('ENVIRONMENT', default='development')
     debug: bool = config('DEBUG', default=False, cast=bool)
@@ -3,7 +3,12 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from ..core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Custo calibrado com scripts/calibrate_bcrypt.py (BCRYPT_ROUNDS)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.bcrypt_rounds
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
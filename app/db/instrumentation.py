@@ -0,0 +1,119 @@
+"""
+    Esse código instrumenta o cliente Prisma. Todas as operações dos
+modelos (find_many, create, ...) e o query_raw passam por Prisma._execute,
+inclusive nos clientes de transação (tx()), então o wrapper fica na
+classe: cada consulta é medida e contada por modelo/operação e somada às
+métricas da requisição atual (consultas, linhas lidas ou afetadas e tempo).
+
+Consultas acima de DB_SLOW_QUERY_MS vão para o log "app.db.slow" com o
+modelo, a operação, o número de linhas e os argumentos sem os valores
+(ex.: {"where": {"user_id": "?"}, "take": 101}), no campo query_args.
+"""
+import functools
+import logging
+import time
+from typing import Any
+from prisma import Prisma
+from ..core.config import settings
+from ..services.metrics import DB_QUERIES, DB_QUERY_DURATION, request_stats
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("app.db.slow")
+
+# Argumentos mantidos no log: paginação e direção de ordenação não são dados do usuário
+_KEPT_KEYS = {"take", "skip", "distinct"}
+_ORDER_VALUES = {"asc", "desc"}
+
+
+def row_count(response: Any, method: str = "") -> int:
+    """
+    Linhas devolvidas ou afetadas, conforme o formato do resultado do engine:
+    lista = várias; query_raw = {"columns", "types", "rows"}; execute_raw =
+    inteiro; create_many/update_many/delete_many = {"count": n}; count = 0
+    (só um número agregado); outro objeto = uma; vazio = nenhuma.
+    """
+    try:
+        result = response["data"]["result"]
+    except (KeyError, TypeError):
+        return 0
+    if result is None or method == "count":
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, bool):
+        return 1
+    if isinstance(result, int):
+        return result
+    if isinstance(result, dict):
+        if isinstance(result.get("rows"), list):
+            return len(result["rows"])
+        if method.endswith("_many") and isinstance(result.get("count"), int):
+            return result["count"]
+    return 1
+
+
+def redact(value: Any, key: str = "") -> Any:
+    """
+    Troca os valores dos argumentos por "?" mantendo a estrutura (campos,
+    operadores e tamanho das listas). No query_raw o SQL é mantido, só os
+    parâmetros são removidos.
+    """
+    if isinstance(value, dict):
+        return {k: redact(v, k) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        # Listas curtas de objetos (ex.: order, OR) mantêm a estrutura
+        if 0 < len(value) <= 5 and all(isinstance(item, dict) for item in value):
+            return [redact(item) for item in value]
+        return f"<{len(value)} itens>"
+    if key in _KEPT_KEYS or key == "query" or value in _ORDER_VALUES or value is None:
+        return value
+    return "?"
+
+
+def instrument(client_class: type = Prisma) -> None:
+    """Envolve `_execute` da classe do cliente (só uma vez)"""
+    execute = getattr(client_class, "_execute", None)
+    if execute is None:
+        logger.warning("Prisma._execute não encontrado; consultas não serão instrumentadas")
+        return
+    if getattr(execute, "instrumented", False):
+        return
+
+    slow_seconds = settings.db_slow_query_ms / 1000
+
+    @functools.wraps(execute)
+    async def _execute(self, *args: Any, **kwargs: Any) -> Any:
+        model = getattr(kwargs.get("model"), "__name__", "raw")
+        method = kwargs.get("method", "unknown")
+        start = time.perf_counter()
+        response = None
+        try:
+            response = await execute(self, *args, **kwargs)
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            rows = row_count(response, method)
+            DB_QUERIES.inc(model, method)
+            DB_QUERY_DURATION.observe(elapsed, model, method)
+
+            stats = request_stats.get()
+            if stats is not None:
+                stats.queries += 1
+                stats.rows += rows
+                stats.seconds += elapsed
+                if stats.operations is not None:
+                    name = f"{model}.{method}"
+                    stats.operations[name] = stats.operations.get(name, 0) + 1
+
+            if elapsed >= slow_seconds:
+                slow_query_logger.warning(
+                    "Consulta lenta: %s.%s (%.1f ms, %s linhas)",
+                    model,
+                    method,
+                    elapsed * 1000,
+                    rows,
+                    extra={"query_args": redact(kwargs.get("arguments"))}
+                )
+
+    _execute.instrumented = True
+    client_class._execute = _execute
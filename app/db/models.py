@@ -88,6 +88,7 @@ class MessageType(str, Enum):
     EXPENSE = "EXPENSE"
     BALANCE = "BALANCE"
     STATEMENT = "STATEMENT"
+    STATEMENT_MORE = "STATEMENT_MORE"
     REPORT = "REPORT"
     CATEGORIES = "CATEGORIES"
     CATEGORY_REPORT = "CATEGORY_REPORT"
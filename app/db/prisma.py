@@ -1,45 +1,112 @@
+"""
+    Esse código mantém o cliente Prisma único da aplicação. A conexão é
+aberta no lifespan do FastAPI e fechada no desligamento; depois de
+conectado, get_prisma não usa lock nem chama connect() de novo.
+"""
 from prisma import Prisma
 from functools import lru_cache
 import asyncio
+import logging
 from contextlib import asynccontextmanager
+from datetime import timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from ..core.config import settings
+from .instrumentation import instrument
 
-prisma = Prisma()
+logger = logging.getLogger(__name__)
+
+
+def _database_url() -> str:
+    """DATABASE_URL com o tamanho do pool e o timeout do pool (se ainda não informados)"""
+    parts = urlsplit(settings.database_url)
+    params = dict(parse_qsl(parts.query))
+    params.setdefault("connection_limit", str(settings.db_pool_size))
+    params.setdefault("pool_timeout", str(settings.db_pool_timeout))
+    return urlunsplit(parts._replace(query=urlencode(params)))
+
+
+def pool_settings() -> dict:
+    """
+    Limites do pool de conexões em uso (os de DATABASE_URL têm prioridade
+    sobre DB_POOL_SIZE/DB_POOL_TIMEOUT)
+    """
+    params = dict(parse_qsl(urlsplit(_database_url()).query))
+    return {
+        "connection_limit": int(params["connection_limit"]),
+        "pool_timeout_s": int(params["pool_timeout"]),
+    }
+
+
+prisma = Prisma(
+    datasource={"url": _database_url()},
+    connect_timeout=timedelta(seconds=settings.db_connect_timeout),
+    http={"timeout": settings.db_query_timeout}
+)
 connection_lock = asyncio.Lock()
-is_connected = False
 
-async def ensure_connection():
-    global is_connected
+# Contagem de consultas e linhas por requisição (métricas)
+instrument(Prisma)
+
+
+async def connect(retries: int = 1) -> None:
+    """
+    Conecta ao banco (uma única vez, mesmo com chamadas simultâneas),
+    tentando até `retries` vezes.
+    """
     async with connection_lock:
-        if not is_connected:
+        for attempt in range(1, retries + 1):
+            if prisma.is_connected():
+                return
             try:
                 await prisma.connect()
-                is_connected = True
-                print("Conexão com o banco de dados estabelecida")
+                logger.info("Conexão com o banco de dados estabelecida")
+                return
             except Exception as e:
-                if "Already connected" in str(e):
-                    is_connected = True
-                    print("Conexão já existente, continuando...")
-                    return
-                print(f"Erro de conexão: {str(e)}")
-                raise e
+                logger.warning("Erro de conexão (tentativa %s/%s): %s", attempt, retries, e)
+                if attempt == retries:
+                    raise
+                await asyncio.sleep(settings.db_connect_retry_delay)
+
+
+async def disconnect() -> None:
+    async with connection_lock:
+        if prisma.is_connected():
+            await prisma.disconnect()
+            logger.info("Conexão com o banco de dados encerrada")
+
+
+async def ensure_connection():
+    # Caminho rápido: já conectado, sem lock
+    if not prisma.is_connected():
+        await connect()
+
 
 @asynccontextmanager
-async def get_db():
-    await ensure_connection()
+async def lifespan(app):
+    """Conecta na inicialização e desconecta no desligamento da aplicação"""
     try:
-        yield prisma
+        await connect(retries=settings.db_connect_retries)
+    except Exception:
+        # A aplicação sobe mesmo assim; a próxima requisição tenta de novo
+        logger.error("Banco indisponível na inicialização, nova tentativa na próxima requisição")
+    try:
+        yield
     finally:
-        # Não desconectamos aqui para manter a conexão persistente
-        pass
+        await disconnect()
+
+
+@asynccontextmanager
+async def get_db():
+    await ensure_connection()
+    yield prisma
+
 
 @lru_cache()
 def create_prisma():
     return prisma
 
+
 async def get_prisma():
-    await ensure_connection()
-    try:
-        yield prisma
-    except Exception as e:
-        print(f"Erro Prisma: {str(e)}")
-        raise e
\ No newline at end of file
+    if not prisma.is_connected():
+        await connect()
+    yield prisma
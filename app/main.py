@@ -4,34 +4,35 @@ todas funcionalidades do sistema.
 
 author: github.com/dreeilima
 """
-import json
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse, JSONResponse
-from .routes import users, whatsapp, transactions, categories, auth, reports
+from .routes import users, whatsapp, transactions, categories, auth, reports, health, metrics
 from fastapi.responses import RedirectResponse
-from .db.prisma import create_prisma, is_connected
+from .db.prisma import lifespan
 from .core.config import settings
-import uuid
-from decimal import Decimal
+from .utils.serialization import ORJSONResponse
+from .services.logs import RequestIDMiddleware, setup_logging
+from .services.metrics import MetricsMiddleware
 
-class CustomJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, uuid.UUID):
-            return str(obj)
-        if isinstance(obj, Decimal):
-            return str(obj)
-        return super().default(obj)
-
-prisma = create_prisma()
+# Logs em JSON, gravados por uma thread em segundo plano
+setup_logging()
+logger = logging.getLogger(__name__)
 
+# Respostas serializadas com orjson (Decimal, UUID e datetime inclusos)
 app = FastAPI(
     title="FinControl API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-# Configurar encoder personalizado para JSONResponse
-app.json_encoder = CustomJSONEncoder
+# Latência, status e consultas ao banco por rota (GET /metrics)
+app.add_middleware(MetricsMiddleware)
+
+# Id da requisição nos logs e no cabeçalho X-Request-ID
+app.add_middleware(RequestIDMiddleware)
 
 # Configurar CORS
 app.add_middleware(
@@ -40,6 +41,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cabeçalhos próprios que o front-end precisa ler (paginação e logs)
+    expose_headers=["X-Next-Cursor", "X-Request-ID"],
 )
 
 # Incluir rotas
@@ -49,6 +52,8 @@ app.include_router(transactions.router, prefix="/transactions", tags=["transacti
 app.include_router(categories.router)
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(reports.router, prefix="/reports", tags=["reports"])
+app.include_router(health.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 async def root():
@@ -62,30 +67,4 @@ async def head_root():
 async def redirect():
     return RedirectResponse("/docs#")
 
-@app.on_event("startup")
-async def startup():
-    try:
-        global is_connected
-        if not is_connected:
-            print("Iniciando conexão com o banco...")
-            await prisma.connect()
-            is_connected = True
-            print("Conexão estabelecida com sucesso")
-        print("\n=== CONFIGURAÇÕES ===")
-        print(f"WhatsApp URL: {settings.whatsapp_service_url}")
-        print(f"WhatsApp Secret Key: {'*' * len(settings.whatsapp_secret_key)}")
-        print(f"Env file path: {settings.Config.env_file}")
-    except Exception as e:
-        if "Already connected" not in str(e):
-            print(f"Erro ao conectar: {str(e)}")
-            # Não levante a exceção, apenas registre
-            print("Continuando mesmo com erro de conexão...")
-
-@app.on_event("shutdown")
-async def shutdown():
-    prisma = create_prisma()
-    if prisma.is_connected():
-        await prisma.disconnect()
-
-print("\n=== CONFIGURAÇÕES ===")
-print(f"WhatsApp URL: {settings.whatsapp_service_url}")
+logger.info("Configurações carregadas (WhatsApp URL: %s)", settings.whatsapp_service_url)
@@ -1,6 +1,10 @@
-from typing import Dict, Any
+from typing import Any, Callable, Dict, Optional
 from datetime import datetime
+import logging
 import anthropic
+from ..utils.formatting import format_brl
+
+logger = logging.getLogger(__name__)
 
 # Mensagens de resposta
 REGISTRATION_INFO = """
@@ -113,8 +117,8 @@ BALANCE_RESPONSE = """
 {status_emoji} Status: {status}
 
 🔄 *Resumo Rápido:*
-📈 Últimas receitas: R$ {total_receitas:.2f}
-📉 Últimas despesas: R$ {total_despesas:.2f}
+📈 Últimas receitas: R$ {total_receitas}
+📉 Últimas despesas: R$ {total_despesas}
 
 💡 *Dica:* Use "📋 extrato" para ver todas as transações.
 """
@@ -124,67 +128,98 @@ STATEMENT_RESPONSE = """
 ━━━━━━━━━━━━━━━━━━━━━
 
 📊 *Resumo Geral:*
-📈 Receitas: R$ {total_receitas:.2f}
-📉 Despesas: R$ {total_despesas:.2f}
-💰 Saldo: R$ {saldo:.2f}
+📈 Receitas: R$ {total_receitas}
+📉 Despesas: R$ {total_despesas}
+💰 Saldo: R$ {saldo}
 
-🔍 *Todas as Transações:*
+🔍 *Últimas Transações:*
 {transactions_list}
-
+{continuation}
 💡 *Dica:* Use "📈 relatório" para ver análises mais detalhadas.
 """
 
-REPORT_RESPONSE = """
-📊 *Relatório {period_name}* 📊
+STATEMENT_CONTINUATION = """
+➡️ Digite "mais" para ver as próximas {page_size} transações.
+"""
+
+REPORT_RESPONSE = """📊 Relatório {period_name} 📊
 ━━━━━━━━━━━━━━━━━━━━━
 
-💰 *Resumo Financeiro:*
-📈 Receitas: R$ {receitas:.2f} ({num_receitas} transações)
-📉 Despesas: R$ {despesas:.2f} ({num_despesas} transações)
-💰 Saldo: {saldo_emoji} R$ {saldo:.2f}
+💰 Resumo Financeiro:
+📈 Receitas: R$ {receitas} ({num_receitas} transações)
+📉 Despesas: R$ {despesas} ({num_despesas} transações)
+💰 Saldo: {saldo_emoji} R$ {saldo}
 
-📈 *Médias por Transação:*
-📈 Receita média: R$ {media_receitas:.2f}
-📉 Despesa média: R$ {media_despesas:.2f}
+📈 Médias por Transação:
+📈 Receita média: R$ {media_receitas}
+📉 Despesa média: R$ {media_despesas}
 
-🏷️ *Top 5 Categorias:*
+🏷 Top 5 Categorias:
 {lista_categorias}
 
-💡 *Dicas:*
+💡 Dicas:
 • Digite 'relatório categoria [nome]' para mais detalhes
 • Use 'relatório [diário/semanal/mensal/anual]'
 
-🎯 *Dica:* Quer ver o relatório de alguma categoria específica?
-"""
+🎯 Dica: Quer ver o relatório de alguma categoria específica?
+{instrucoes}"""
+
+WEEKLY_REPORT_RESPONSE = """📊 Relatório Semanal 📊
+━━━━━━━━━━━━━━━━━━━━━
+
+💰 Resumo Financeiro:
+📈 Receitas: R$ {receitas} ({total_receitas} transações)
+📉 Despesas: R$ {despesas} ({total_despesas} transações)
+💰 Saldo: {saldo_emoji} R$ {saldo}
+
+📈 Médias por Transação:
+📈 Receita média: R$ {media_receita}
+📉 Despesa média: R$ {media_despesa}
+
+🏷 Top 5 Categorias:
+{top_categorias}
+💡 Dicas:
+• Digite 'relatório categoria [nome]' para mais detalhes
+• Use 'relatório [diário/semanal/mensal/anual]'
+
+🎯 Dica: Quer ver o relatório de alguma categoria específica?"""
 
-CATEGORY_REPORT_RESPONSE = """
-📊 *Relatório da Categoria: {category}* 📊
+WEEKLY_REPORT_CATEGORY = "• {name}: R$ {amount} ({count} transações)\n"
+
+CATEGORY_REPORT_RESPONSE = """📊 Relatório da Categoria: {category} 📊
 ━━━━━━━━━━━━━━━━━━━━━
 
-💰 *Resumo:*
-📈 Total gasto: R$ {total:.2f}
-📊 Média por transação: R$ {media:.2f}
-🔄 Última transação: R$ {ultima:.2f}
+💰 Resumo:
+📈 Total gasto: R$ {total}
+📊 Média por transação: R$ {media}
+🔄 Última transação: R$ {ultima}
 
 {meses_list}
+💡 Dica: Use "📋 extrato" para ver todas as transações desta categoria."""
 
-💡 *Dica:* Use "📋 extrato" para ver todas as transações desta categoria.
-"""
+CATEGORY_REPORT_EMPTY = """📊 Relatório da Categoria: {category} 📊
+━━━━━━━━━━━━━━━━━━━━━
 
-EDIT_RESPONSE = """
-✅ *Transação Atualizada com Sucesso!* ✅
+Nenhuma transação encontrada para esta categoria."""
 
-📝 *Novos Detalhes:*
-💰 Valor: R$ {valor:.2f}
-📄 Descrição: {description}
-🏷️ Categoria: {category}
+EDIT_RESPONSE = """✅ Transação atualizada com sucesso!
 
-💡 *Dica:* Use "📋 extrato" para ver todas as suas transações.
-"""
+📝 Detalhes:
+• Tipo: {tipo}
+• Valor: R$ {valor}
+• Descrição: {description}
+• Categoria: {category}
+
+💡 Use 'extrato' para ver todas as transações."""
+
+DELETE_RESPONSE = """✅ Transação excluída com sucesso!
+
+💡 Use 'extrato' para ver todas as transações."""
 
 NO_TRANSACTIONS = "📭 Nenhuma transação encontrada."
 NO_TRANSACTIONS_BALANCE = "📭 Nenhuma transação encontrada. Seu saldo é R$ 0,00"
 NO_TRANSACTIONS_STATEMENT = "📭 Nenhuma transação encontrada no seu extrato."
+NO_MORE_TRANSACTIONS_STATEMENT = "📭 Não há mais transações no seu extrato. Use \"📋 extrato\" para ver as mais recentes."
 NO_TRANSACTIONS_CATEGORY = "❌ Nenhuma transação encontrada na categoria '{category}'"
 
 HELP_MESSAGE = """
@@ -281,8 +316,8 @@ HELP_DETAILS_MAP = {
         "examples": "• saldo\n• 💰 saldo"
     },
     "extrato": {
-        "details": "Mostra todas as suas transações com detalhes, incluindo data, valor, descrição e categoria. As transações são ordenadas da mais recente para a mais antiga.",
-        "examples": "• extrato\n• 📋 extrato"
+        "details": "Mostra suas transações com detalhes, incluindo data, valor, descrição e categoria. As transações são ordenadas da mais recente para a mais antiga, em páginas; digite 'mais' para ver a próxima página.",
+        "examples": "• extrato\n• 📋 extrato\n• mais"
     },
     "relatório": {
         "details": "Gera relatórios financeiros detalhados. Você pode especificar o período (diário, semanal, mensal, anual) ou uma categoria específica.",
@@ -298,7 +333,242 @@ HELP_DETAILS_MAP = {
     }
 }
 
-async def generateResponse(context: Dict[str, Any]) -> str:
+# Registro de renderizadores por tipo de resposta.
+# Os templates são pré-compilados (método format já vinculado) na carga do
+# módulo, e o despacho é uma única consulta ao dicionário.
+Renderer = Callable[[Dict[str, Any]], Optional[str]]
+
+RENDERERS: Dict[str, Renderer] = {}
+
+UNKNOWN_RESPONSE = "❓ Desculpe, não entendi sua solicitação. Use 'ajuda' para ver os comandos disponíveis."
+RENDER_ERROR = "❌ Desculpe, ocorreu um erro ao gerar a resposta."
+
+def renderer(*response_types: str) -> Callable[[Renderer], Renderer]:
+    """Registra a função como renderizador dos tipos de resposta informados"""
+    def register(render: Renderer) -> Renderer:
+        for response_type in response_types:
+            RENDERERS[response_type] = render
+        return render
+    return register
+
+
+def _static(response_type: str, message: Optional[str]) -> None:
+    """Registra uma resposta fixa, que não depende do contexto"""
+    RENDERERS[response_type] = lambda context: message
+
+
+_render_confirmation = TRANSACTION_CONFIRMATION.format
+_render_transaction_error = TRANSACTION_ERROR.format
+_render_registration = REGISTRATION_INFO.format
+_render_welcome = WELCOME_REGISTERED_USER.format
+_render_balance = BALANCE_RESPONSE.format
+_render_statement = STATEMENT_RESPONSE.format
+_render_continuation = STATEMENT_CONTINUATION.format
+_render_report = REPORT_RESPONSE.format
+_render_weekly_report = WEEKLY_REPORT_RESPONSE.format
+_render_weekly_category = WEEKLY_REPORT_CATEGORY.format
+_render_category_report = CATEGORY_REPORT_RESPONSE.format
+_render_category_empty = CATEGORY_REPORT_EMPTY.format
+_render_edit = EDIT_RESPONSE.format
+_render_no_transactions_category = NO_TRANSACTIONS_CATEGORY.format
+_render_help_details = HELP_DETAILS.format
+
+# Ajuda detalhada já renderizada para cada comando conhecido
+_HELP_DETAILS_RENDERED = {
+    command: _render_help_details(command=command, **details)
+    for command, details in HELP_DETAILS_MAP.items()
+}
+
+
+def _transaction_renderer(tipo: str, fallback: str) -> Renderer:
+    error = _render_transaction_error(type=tipo)
+
+    def render(context: Dict[str, Any]) -> str:
+        step = context.get("step")
+        if step == "CONFIRMATION":
+            return _render_confirmation(
+                type=tipo,
+                amount=format_brl(context.get("amount", 0)),
+                description=context.get("description", ""),
+                category=context.get("category", ""),
+                date=context.get("date", "")
+            )
+        if step == "ERROR":
+            return error
+        return fallback
+    return render
+
+
+RENDERERS["INCOME"] = _transaction_renderer(
+    "receita", "❌ Desculpe, ocorreu um erro ao processar sua receita."
+)
+RENDERERS["EXPENSE"] = _transaction_renderer(
+    "despesa", "❌ Desculpe, ocorreu um erro ao processar sua despesa."
+)
+
+
+@renderer("TRANSACTION")
+def _render_transaction(context: Dict[str, Any]) -> str:
+    step = context.get("step")
+    if step == "CONFIRMATION":
+        return _render_confirmation(
+            type="despesa" if context.get("type") == "EXPENSE" else "receita",
+            amount=format_brl(context.get("amount", 0)),
+            description=context.get("description", ""),
+            category=context.get("category", ""),
+            date=context.get("date", "")
+        )
+    if step == "ERROR":
+        return _render_transaction_error(type=context.get("type", ""))
+    return "❌ Desculpe, ocorreu um erro ao processar sua transação."
+
+
+@renderer("REGISTRATION_INFO")
+def _render_registration_info(context: Dict[str, Any]) -> str:
+    return _render_registration(siteUrl=context.get("siteUrl", ""))
+
+
+@renderer("WELCOME_REGISTERED_USER")
+def _render_welcome_registered_user(context: Dict[str, Any]) -> str:
+    return _render_welcome(name=context.get("userName", ""))
+
+
+@renderer("ERROR")
+def _render_error(context: Dict[str, Any]) -> str:
+    if context.get("errorType", "") == "TRANSACTION_NOT_FOUND":
+        return "❌ Transação não encontrada. Verifique o ID e tente novamente."
+    return "❌ Ocorreu um erro. Tente novamente mais tarde."
+
+
+@renderer("BALANCE")
+def _render_balance_response(context: Dict[str, Any]) -> str:
+    return _render_balance(
+        balance=format_brl(context.get("balance", 0)),
+        status_emoji=context.get("status_emoji", ""),
+        status=context.get("status", ""),
+        total_receitas=format_brl(context.get("total_receitas", 0)),
+        total_despesas=format_brl(context.get("total_despesas", 0))
+    )
+
+
+@renderer("STATEMENT")
+def _render_statement_response(context: Dict[str, Any]) -> str:
+    return _render_statement(
+        total_receitas=format_brl(context.get("total_receitas", 0)),
+        total_despesas=format_brl(context.get("total_despesas", 0)),
+        saldo=format_brl(context.get("saldo", 0)),
+        transactions_list=context.get("transactions_list", ""),
+        continuation=_render_continuation(page_size=context.get("page_size", 0))
+        if context.get("has_more") else ""
+    )
+
+
+@renderer("REPORT")
+def _render_report_response(context: Dict[str, Any]) -> str:
+    return _render_report(
+        period_name=context.get("period_name", ""),
+        receitas=format_brl(context.get("receitas", 0)),
+        num_receitas=context.get("num_receitas", 0),
+        despesas=format_brl(context.get("despesas", 0)),
+        num_despesas=context.get("num_despesas", 0),
+        saldo_emoji=context.get("saldo_emoji", "➡️"),
+        saldo=format_brl(context.get("saldo", 0)),
+        media_receitas=format_brl(context.get("media_receitas", 0)),
+        media_despesas=format_brl(context.get("media_despesas", 0)),
+        lista_categorias=context.get("lista_categorias", ""),
+        instrucoes=context.get("instrucoes", "")
+    )
+
+
+@renderer("WEEKLY_REPORT")
+def _render_weekly_report_response(context: Dict[str, Any]) -> str:
+    saldo = context.get("saldo", 0)
+    return _render_weekly_report(
+        receitas=format_brl(context.get("receitas", 0)),
+        total_receitas=context.get("total_receitas", 0),
+        despesas=format_brl(context.get("despesas", 0)),
+        total_despesas=context.get("total_despesas", 0),
+        saldo_emoji="↗" if saldo >= 0 else "↘",
+        saldo=format_brl(saldo),
+        media_receita=format_brl(context.get("media_receita", 0)),
+        media_despesa=format_brl(context.get("media_despesa", 0)),
+        top_categorias="".join(
+            _render_weekly_category(name=cat["name"], amount=format_brl(cat["amount"]), count=cat["count"])
+            for cat in context.get("top_categorias", [])
+        )
+    )
+
+
+@renderer("CATEGORY_REPORT")
+def _render_category_report_response(context: Dict[str, Any]) -> str:
+    category = context.get("category", "")
+    total = context.get("total", 0)
+    if total == 0:
+        return _render_category_empty(category=category)
+    return _render_category_report(
+        category=category,
+        total=format_brl(total),
+        media=format_brl(context.get("media", 0)),
+        ultima=format_brl(context.get("ultima", 0)),
+        meses_list=context.get("meses_list", "")
+    )
+
+
+@renderer("EDIT")
+def _render_edit_response(context: Dict[str, Any]) -> str:
+    return _render_edit(
+        tipo=context.get("tipo", ""),
+        valor=format_brl(context.get("valor", 0)),
+        description=context.get("description", ""),
+        category=context.get("category", "")
+    )
+
+
+@renderer("NO_TRANSACTIONS_CATEGORY")
+def _render_no_transactions_category_response(context: Dict[str, Any]) -> str:
+    return _render_no_transactions_category(category=context.get("category", ""))
+
+
+@renderer("HELP_DETAILS")
+def _render_help_details_response(context: Dict[str, Any]) -> str:
+    command = context.get("command", "")
+    rendered = _HELP_DETAILS_RENDERED.get(command)
+    if rendered is not None:
+        return rendered
+    return _render_help_details(
+        command=command,
+        details="Comando não encontrado.",
+        examples="Use 'ajuda' para ver todos os comandos disponíveis."
+    )
+
+
+_static("DELETE", DELETE_RESPONSE)
+_static("NO_TRANSACTIONS", NO_TRANSACTIONS)
+_static("NO_TRANSACTIONS_BALANCE", NO_TRANSACTIONS_BALANCE)
+_static("NO_TRANSACTIONS_STATEMENT", NO_TRANSACTIONS_STATEMENT)
+_static("NO_MORE_TRANSACTIONS_STATEMENT", NO_MORE_TRANSACTIONS_STATEMENT)
+_static("HELP_MESSAGE", HELP_MESSAGE)
+# Gerado pelo FinancialAdvisorService (app/services/ai_service.py)
+_static("FINANCIAL_ADVICE", None)
+
+
+def render(context: Dict[str, Any]) -> Optional[str]:
+    """
+    Renderiza a resposta de forma síncrona (usado pelo generateResponse e
+    pelo benchmark em scripts/bench_renderers.py).
+    """
+    render_fn = RENDERERS.get(context.get("type"))
+    if render_fn is None:
+        logger.warning("Tipo de resposta não reconhecido: %s", context.get("type"))
+        return UNKNOWN_RESPONSE
+    try:
+        return render_fn(context)
+    except Exception as e:
+        logger.exception("Erro ao gerar resposta")
+        return RENDER_ERROR
+
+
+async def generateResponse(context: Dict[str, Any]) -> Optional[str]:
     """
     Gera uma resposta baseada no contexto fornecido.
     
@@ -308,229 +578,4 @@ async def generateResponse(context: Dict[str, Any]) -> str:
     Returns:
         str: Mensagem formatada
     """
-    try:
-        print(f"\n=== GERANDO RESPOSTA ===")
-        print(f"Contexto recebido: {context}")
-        
-        response_type = context.get("type")
-        print(f"Tipo de resposta: {response_type}")
-        
-        if response_type == "INCOME":
-            if context.get("step") == "CONFIRMATION":
-                return TRANSACTION_CONFIRMATION.format(
-                    type="receita",
-                    amount=context.get("amount", 0),
-                    description=context.get("description", ""),
-                    category=context.get("category", ""),
-                    date=context.get("date", "")
-                )
-            elif context.get("step") == "ERROR":
-                return TRANSACTION_ERROR.format(type="receita")
-            return "❌ Desculpe, ocorreu um erro ao processar sua receita."
-            
-        elif response_type == "EXPENSE":
-            if context.get("step") == "CONFIRMATION":
-                return TRANSACTION_CONFIRMATION.format(
-                    type="despesa",
-                    amount=context.get("amount", 0),
-                    description=context.get("description", ""),
-                    category=context.get("category", ""),
-                    date=context.get("date", "")
-                )
-            elif context.get("step") == "ERROR":
-                return TRANSACTION_ERROR.format(type="despesa")
-            return "❌ Desculpe, ocorreu um erro ao processar sua despesa."
-            
-        elif response_type == "REGISTRATION_INFO":
-            return REGISTRATION_INFO.format(siteUrl=context.get("siteUrl", ""))
-            
-        elif response_type == "WELCOME_REGISTERED_USER":
-            return WELCOME_REGISTERED_USER.format(name=context.get("userName", ""))
-            
-        elif response_type == "ERROR":
-            error_type = context.get("errorType", "")
-            if error_type == "TRANSACTION_NOT_FOUND":
-                return "❌ Transação não encontrada. Verifique o ID e tente novamente."
-            return "❌ Ocorreu um erro. Tente novamente mais tarde."
-            
-        elif response_type == "TRANSACTION":
-            print(f"Step: {context.get('step')}")
-            if context.get("step") == "CONFIRMATION":
-                tipo = "despesa" if context.get("type") == "EXPENSE" else "receita"
-                print(f"Tipo: {tipo}")
-                print(f"Amount: {context.get('amount')}")
-                print(f"Description: {context.get('description')}")
-                print(f"Category: {context.get('category')}")
-                print(f"Date: {context.get('date')}")
-                
-                return TRANSACTION_CONFIRMATION.format(
-                    type=tipo,
-                    amount=context.get("amount", 0),
-                    description=context.get("description", ""),
-                    category=context.get("category", ""),
-                    date=context.get("date", "")
-                )
-            elif context.get("step") == "ERROR":
-                return TRANSACTION_ERROR.format(type=context.get("type", ""))
-            return "❌ Desculpe, ocorreu um erro ao processar sua transação."
-            
-        elif response_type == "BALANCE":
-            return BALANCE_RESPONSE.format(
-                balance=context.get("balance", 0),
-                status_emoji=context.get("status_emoji", ""),
-                status=context.get("status", ""),
-                total_receitas=context.get("total_receitas", 0),
-                total_despesas=context.get("total_despesas", 0)
-            )
-            
-        elif response_type == "STATEMENT":
-            return STATEMENT_RESPONSE.format(
-                total_receitas=context.get("total_receitas", 0),
-                total_despesas=context.get("total_despesas", 0),
-                saldo=context.get("saldo", 0),
-                transactions_list=context.get("transactions_list", "")
-            )
-            
-        elif response_type == "REPORT":
-            period_name = context.get("period_name", "")
-            receitas = context.get("receitas", 0)
-            num_receitas = context.get("num_receitas", 0)
-            despesas = context.get("despesas", 0)
-            num_despesas = context.get("num_despesas", 0)
-            saldo_emoji = context.get("saldo_emoji", "➡️")
-            saldo = context.get("saldo", 0)
-            media_receitas = context.get("media_receitas", 0)
-            media_despesas = context.get("media_despesas", 0)
-            lista_categorias = context.get("lista_categorias", "")
-            instrucoes = context.get("instrucoes", "")
-            
-            message = f"📊 Relatório {period_name} 📊\n━━━━━━━━━━━━━━━━━━━━━\n\n"
-            message += f"💰 Resumo Financeiro:\n"
-            message += f"📈 Receitas: R$ {receitas:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + f" ({num_receitas} transações)\n"
-            message += f"📉 Despesas: R$ {despesas:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + f" ({num_despesas} transações)\n"
-            message += f"💰 Saldo: {saldo_emoji} R$ {saldo:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + "\n\n"
-            
-            message += f"📈 Médias por Transação:\n"
-            message += f"📈 Receita média: R$ {media_receitas:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + "\n"
-            message += f"📉 Despesa média: R$ {media_despesas:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + "\n\n"
-            
-            message += f"🏷 Top 5 Categorias:\n{lista_categorias}\n"
-            
-            message += f"\n💡 Dicas:\n"
-            message += f"• Digite 'relatório categoria [nome]' para mais detalhes\n"
-            message += f"• Use 'relatório [diário/semanal/mensal/anual]'\n\n"
-            message += f"🎯 Dica: Quer ver o relatório de alguma categoria específica?\n"
-            message += f"{instrucoes}"
-            return message
-            
-        elif response_type == "CATEGORY_REPORT":
-            category = context.get("category", "")
-            total = context.get("total", 0)
-            media = context.get("media", 0)
-            ultima = context.get("ultima", 0)
-            meses_list = context.get("meses_list", "")
-            
-            if total == 0:
-                return f"📊 Relatório da Categoria: {category} 📊\n━━━━━━━━━━━━━━━━━━━━━\n\nNenhuma transação encontrada para esta categoria."
-            
-            # Formatar mensagem
-            message = f"📊 Relatório da Categoria: {category} 📊\n━━━━━━━━━━━━━━━━━━━━━\n\n"
-            message += f"💰 Resumo:\n"
-            message += f"📈 Total gasto: R$ {total:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + "\n"
-            message += f"📊 Média por transação: R$ {media:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + "\n"
-            message += f"🔄 Última transação: R$ {ultima:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + "\n\n"
-            
-            # Adicionar gastos por mês
-            message += f"{meses_list}"
-            
-            message += f"\n💡 Dica: Use \"📋 extrato\" para ver todas as transações desta categoria."
-            return message
-            
-        elif response_type == "EDIT":
-            tipo = context.get("tipo", "")
-            valor = context.get("valor", 0)
-            description = context.get("description", "")
-            category = context.get("category", "")
-            
-            message = f"✅ Transação atualizada com sucesso!\n\n"
-            message += f"📝 Detalhes:\n"
-            message += f"• Tipo: {tipo}\n"
-            message += f"• Valor: R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + "\n"
-            message += f"• Descrição: {description}\n"
-            message += f"• Categoria: {category}\n\n"
-            message += f"💡 Use 'extrato' para ver todas as transações."
-            return message
-            
-        elif response_type == "DELETE":
-            message = f"✅ Transação excluída com sucesso!\n\n"
-            message += f"💡 Use 'extrato' para ver todas as transações."
-            return message
-            
-        elif response_type == "NO_TRANSACTIONS":
-            return NO_TRANSACTIONS
-            
-        elif response_type == "NO_TRANSACTIONS_BALANCE":
-            return NO_TRANSACTIONS_BALANCE
-            
-        elif response_type == "NO_TRANSACTIONS_STATEMENT":
-            return NO_TRANSACTIONS_STATEMENT
-            
-        elif response_type == "NO_TRANSACTIONS_CATEGORY":
-            return NO_TRANSACTIONS_CATEGORY.format(category=context.get("category", ""))
-            
-        elif response_type == "WEEKLY_REPORT":
-            receitas = context.get("receitas", 0)
-            despesas = context.get("despesas", 0)
-            saldo = context.get("saldo", 0)
-            media_receita = context.get("media_receita", 0)
-            media_despesa = context.get("media_despesa", 0)
-            top_categorias = context.get("top_categorias", [])
-            total_receitas = context.get("total_receitas", 0)
-            total_despesas = context.get("total_despesas", 0)
-            
-            message = f"📊 Relatório Semanal 📊\n━━━━━━━━━━━━━━━━━━━━━\n\n"
-            message += f"💰 Resumo Financeiro:\n"
-            message += f"📈 Receitas: R$ {receitas:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + f" ({total_receitas} transações)\n"
-            message += f"📉 Despesas: R$ {despesas:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + f" ({total_despesas} transações)\n"
-            message += f"💰 Saldo: {'↗' if saldo >= 0 else '↘'} R$ {saldo:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + "\n\n"
-            
-            message += f"📈 Médias por Transação:\n"
-            message += f"📈 Receita média: R$ {media_receita:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + "\n"
-            message += f"📉 Despesa média: R$ {media_despesa:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + "\n\n"
-            
-            message += f"🏷 Top 5 Categorias:\n"
-            for cat in top_categorias:
-                message += f"• {cat['name']}: R$ {cat['amount']:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + f" ({cat['count']} transações)\n"
-            
-            message += f"\n💡 Dicas:\n"
-            message += f"• Digite 'relatório categoria [nome]' para mais detalhes\n"
-            message += f"• Use 'relatório [diário/semanal/mensal/anual]'\n\n"
-            message += f"🎯 Dica: Quer ver o relatório de alguma categoria específica?"
-            return message
-            
-        elif response_type == "HELP_MESSAGE":
-            return HELP_MESSAGE
-            
-        elif response_type == "HELP_DETAILS":
-            command = context.get("command", "")
-            details = HELP_DETAILS_MAP.get(command, {
-                "details": "Comando não encontrado.",
-                "examples": "Use 'ajuda' para ver todos os comandos disponíveis."
-            })
-            return HELP_DETAILS.format(
-                command=command,
-                details=details["details"],
-                examples=details["examples"]
-            )
-            
-        elif response_type == "FINANCIAL_ADVICE":
-            # Encaminhar para o claude.js
-            return None
-            
-        else:
-            print(f"Tipo de resposta não reconhecido: {response_type}")
-            return "❓ Desculpe, não entendi sua solicitação. Use 'ajuda' para ver os comandos disponíveis."
-            
-    except Exception as e:
-        print(f"Erro ao gerar resposta: {str(e)}")
-        return "❌ Desculpe, ocorreu um erro ao gerar a resposta." 
\ No newline at end of file
+    return render(context)
@@ -1,24 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from ..core.security import verify_password, create_access_token
+from ..core.security import create_access_token
 from ..db.prisma import get_prisma
 from prisma import Prisma
 from ..db.models import Token
+from ..services.passwords import check_password, client_limiter, enforce_rate_limit, login_limiter
 
 router = APIRouter(tags=["auth"])
 
 @router.post("/token", response_model=Token)
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     prisma: Prisma = Depends(get_prisma)
 ):
+    # Limita as tentativas antes de gastar CPU com o bcrypt
+    login_key = form_data.username.strip().lower()
+    enforce_rate_limit(client_limiter, request.client.host if request.client else "unknown")
+    enforce_rate_limit(login_limiter, login_key)
+
     user = await prisma.users.find_unique(where={"email": form_data.username})
-    if not user or not verify_password(form_data.password, user.password):
+    if not user or not await check_password(form_data.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    login_limiter.reset(login_key)
     access_token = create_access_token(data={"sub": user.id})
-    return {"access_token": access_token, "token_type": "bearer"} 
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"} 
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, HTTPException, Depends
 from prisma import Prisma
 from ..db.prisma import get_prisma
-from ..utils.prisma import ensure_connection
+from ..services.categories import invalidate_category
 from pydantic import BaseModel
 from datetime import datetime
+import logging
 import uuid
 
 router = APIRouter(prefix="/categories", tags=["categories"])
+logger = logging.getLogger(__name__)
 
 class CategoryCreate(BaseModel):
     name: str
@@ -21,9 +23,7 @@ async def create_category(
     prisma: Prisma = Depends(get_prisma)
 ):
     try:
-        await ensure_connection()
-        print(f"\n=== CRIANDO CATEGORIA ===")
-        print(f"Dados recebidos: {category}")
+        logger.debug("Criando categoria: %s", category)
         
         # Verificar se já existe
         existing = await prisma.categories.find_first(
@@ -50,10 +50,11 @@ async def create_category(
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         })
+        invalidate_category(category.user_id, category.name, category.type)
         return data
         
     except Exception as e:
-        print(f"Erro ao criar categoria: {str(e)}")
+        logger.warning("Erro ao criar categoria: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/user/{user_id}")
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Response, status
+from ..db.prisma import create_prisma
+from ..services.health import loop_lag_ms, readiness
+from .whatsapp import whatsapp
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+@router.get("/live")
+async def live():
+    """O processo está de pé e o event loop está respondendo"""
+    return {"status": "alive", "event_loop_lag_ms": await loop_lag_ms()}
+
+@router.get("/ready")
+async def ready(response: Response):
+    """Pronto para tráfego: 200 quando o banco responde, 503 caso contrário"""
+    result = await readiness(create_prisma(), whatsapp.client)
+    if result["status"] != "ready":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return result
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Header
 from prisma import Prisma
 from app.utils.prisma import get_prisma
-from datetime import datetime, timedelta
+from app.services.aggregates import totals_by_type, rollup_totals_by_category
+from app.utils.periods import month_range, period_range, rollup_months, local_now
+from app.db.models import PeriodType
+from datetime import datetime
 from decimal import Decimal
 
 router = APIRouter()
@@ -14,38 +17,26 @@ async def get_financial_summary(
     prisma: Prisma = Depends(get_prisma)
 ):
     try:
-        # Define date range (default to current month if not specified)
+        # Define date range (default to the current month, [start, end), if not specified)
+        current_month = period_range(PeriodType.MONTHLY)
         if not start_date:
-            today = datetime.utcnow()
-            start_date = datetime(today.year, today.month, 1)
+            start_date = current_month.start
         else:
             start_date = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
             
+        # An explicit end_date is inclusive, as before
+        inclusive_end = bool(end_date)
         if not end_date:
-            end_date = datetime.utcnow()
+            end_date = current_month.end
         else:
             end_date = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
 
-        # Get all transactions for the period
-        transactions = await prisma.transactions.find_many(
-            where={
-                "user_id": user_id,
-                "date": {
-                    "gte": start_date,
-                    "lte": end_date
-                }
-            }
-        )
-
-        # Calculate totals
-        total_income = sum(
-            Decimal(str(t.amount)) for t in transactions 
-            if t.type == "INCOME"
-        )
-        total_expenses = sum(
-            Decimal(str(t.amount)) for t in transactions 
-            if t.type == "EXPENSE"
+        # Aggregate totals per type in the database
+        totals = await totals_by_type(
+            prisma, user_id, start_date, end_date, inclusive_end=inclusive_end
         )
+        total_income = totals["INCOME"]["total"]
+        total_expenses = totals["EXPENSE"]["total"]
         
         # Calculate balance
         balance = total_income - total_expenses
@@ -58,7 +49,7 @@ async def get_financial_summary(
             "total_income": float(total_income),
             "total_expenses": float(total_expenses),
             "balance": float(balance),
-            "transaction_count": len(transactions)
+            "transaction_count": totals["INCOME"]["count"] + totals["EXPENSE"]["count"]
         }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -73,36 +64,24 @@ async def get_monthly_report(
     try:
         # Use current year and month if not specified
         if not year or not month:
-            today = datetime.utcnow()
+            today = local_now()
             year = today.year
             month = today.month
 
-        start_date = datetime(year, month, 1)
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1)
-        else:
-            end_date = datetime(year, month + 1, 1)
-
-        transactions = await prisma.transactions.find_many(
-            where={
-                "user_id": user_id,
-                "date": {
-                    "gte": start_date,
-                    "lt": end_date
-                }
-            },
-            order={"date": "asc"}
+        # Monthly totals per category and type (transaction_rollups)
+        rows = await rollup_totals_by_category(
+            prisma, user_id, *rollup_months(month_range(year, month))
         )
 
         # Group by category
         categories = {}
-        for t in transactions:
-            if t.category not in categories:
-                categories[t.category] = {
+        for row in rows:
+            if row["category"] not in categories:
+                categories[row["category"]] = {
                     "INCOME": Decimal("0"),
                     "EXPENSE": Decimal("0")
                 }
-            categories[t.category][t.type] += Decimal(str(t.amount))
+            categories[row["category"]][row["type"]] += row["total"]
 
         return {
             "year": year,
@@ -1,23 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from prisma import Prisma
+from typing import Optional
 from app.schemas.transactions import TransactionOut, TransactionCreate
-from app.utils.prisma import get_prisma, ensure_connection
+from app.utils.prisma import get_prisma
+from app.services.ledger import apply_transaction, notify_write
+from app.services.pagination import decode_cursor, fetch_page, iter_transactions
+from app.services.importer import detect_format, import_transactions, remove_file
+from app.utils.serialization import ORJSONResponse, dumps, to_row, to_rows
+from app.core.config import settings
 from datetime import datetime
+import logging
+import shutil
+import tempfile
 import uuid
 from decimal import Decimal
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Campos da resposta de listagem (os mesmos de TransactionOut)
+TRANSACTION_FIELDS = tuple(TransactionOut.model_fields)
 
 @router.get("/user/{user_id}", response_model=list[TransactionOut])
 async def get_user_transactions(
     user_id: str,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    stream: bool = False,
     prisma: Prisma = Depends(get_prisma)
 ):
+    """
+    Lista as transações do usuário da mais recente para a mais antiga.
+
+    Paginação por cursor: o cabeçalho X-Next-Cursor traz o cursor da próxima
+    página. Com stream=true, devolve todas as transações (a partir do cursor)
+    em NDJSON, buscadas em lotes de `limit`.
+    """
     try:
-        return await prisma.transactions.find_many(
-            where={"user_id": user_id},
-            order={"date": "desc"}
+        page_size = min(limit or settings.transactions_page_size, settings.transactions_max_page_size)
+        where = {"user_id": user_id}
+        if cursor:
+            decode_cursor(cursor)
+
+        if stream:
+            async def ndjson():
+                async for transaction in iter_transactions(prisma, where, page_size, cursor):
+                    yield dumps(to_row(transaction, TRANSACTION_FIELDS)) + b"\n"
+
+            return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+        # Serializa as linhas direto (sem validar cada uma no pydantic)
+        transactions, next_cursor = await fetch_page(prisma, where, cursor, page_size)
+        return ORJSONResponse(
+            to_rows(transactions, TRANSACTION_FIELDS),
+            headers={"X-Next-Cursor": next_cursor} if next_cursor else None
         )
+    except ValueError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -27,18 +69,11 @@ async def create_expense(
     user_id: str = Header(..., alias="user-id"),
     prisma: Prisma = Depends(get_prisma)
 ):
-    print("\n=== CRIANDO DESPESA ===")
-    print("User ID:", user_id)
-    print("Dados da transação:", transaction)
-    print("Campos da transação:", transaction.dict().keys())
-    print("Headers recebidos:", user_id)
+    logger.debug("Criando despesa (usuário %s)", user_id)
     try:
-        await ensure_connection()
         transaction_data = transaction.dict()
-        print("\nDados recebidos:", transaction_data)
         
         transaction_data["user_id"] = user_id  # Manter como string
-        print("User ID:", transaction_data["user_id"])
         
         transaction_data["type"] = "EXPENSE"
         transaction_data["id"] = str(uuid.uuid4())
@@ -48,24 +83,20 @@ async def create_expense(
         # Converter amount para Decimal
         if isinstance(transaction_data["amount"], (int, float)):
             transaction_data["amount"] = Decimal(str(transaction_data["amount"]))
-        print("Amount convertido:", transaction_data["amount"])
         
         # Garantir que a data está no formato correto
         if isinstance(transaction_data["date"], str):
             transaction_data["date"] = datetime.fromisoformat(transaction_data["date"].replace("Z", "+00:00"))
         
-        print("Dados finais:", transaction_data)
-        result = await prisma.transactions.create(data=transaction_data)
-        print("Transação criada:", result)
-        print("=== FIM DA CRIAÇÃO DE DESPESA ===\n")
+        logger.debug("Dados finais: %s", transaction_data)
+        async with prisma.tx() as tx:
+            result = await tx.transactions.create(data=transaction_data)
+            await apply_transaction(tx, result)
+        notify_write(user_id)
+        logger.debug("Despesa %s criada (usuário %s)", result.id, user_id)
         return result
     except Exception as e:
-        print("Erro detalhado:", str(e))
-        print("Tipo do erro:", type(e))
-        print("Dados que causaram o erro:", transaction_data)
-        # Mostrar o erro de validação completo
-        if hasattr(e, 'errors'):
-            print("Erros de validação:", e.errors())
+        logger.warning("Erro ao criar despesa: %s (%s)", e, type(e).__name__, extra={"user_id": user_id})
         # Se for erro de validação, retornar mensagem mais amigável
         if hasattr(e, 'errors'):
             error_msg = e.errors()[0].get('msg', str(e))
@@ -78,18 +109,11 @@ async def create_income(
     user_id: str = Header(..., alias="user-id"),
     prisma: Prisma = Depends(get_prisma)
 ):
-    print("\n=== CRIANDO RECEITA ===")
-    print("User ID:", user_id)
-    print("Dados da transação:", transaction)
-    print("Campos da transação:", transaction.dict().keys())
-    print("Headers recebidos:", user_id)
+    logger.debug("Criando receita (usuário %s)", user_id)
     try:
-        await ensure_connection()
         transaction_data = transaction.dict()
-        print("\nDados recebidos:", transaction_data)
         
         transaction_data["user_id"] = user_id
-        print("User ID:", transaction_data["user_id"])
         
         transaction_data["type"] = "INCOME"
         transaction_data["id"] = str(uuid.uuid4())
@@ -98,26 +122,70 @@ async def create_income(
         
         if isinstance(transaction_data["amount"], (int, float)):
             transaction_data["amount"] = Decimal(str(transaction_data["amount"]))
-        print("Amount convertido:", transaction_data["amount"])
         
         if isinstance(transaction_data["date"], str):
             transaction_data["date"] = datetime.fromisoformat(transaction_data["date"].replace("Z", "+00:00"))
         
-        print("Dados finais:", transaction_data)
-        result = await prisma.transactions.create(data=transaction_data)
-        print("Transação criada:", result)
-        print("=== FIM DA CRIAÇÃO DE RECEITA ===\n")
+        logger.debug("Dados finais: %s", transaction_data)
+        async with prisma.tx() as tx:
+            result = await tx.transactions.create(data=transaction_data)
+            await apply_transaction(tx, result)
+        notify_write(user_id)
+        logger.debug("Receita %s criada (usuário %s)", result.id, user_id)
         return result
     except Exception as e:
-        print("Erro detalhado:", str(e))
-        print("Tipo do erro:", type(e))
-        print("Dados que causaram o erro:", transaction_data)
+        logger.warning("Erro ao criar receita: %s (%s)", e, type(e).__name__, extra={"user_id": user_id})
         if hasattr(e, 'errors'):
-            print("Erros de validação:", e.errors())
             error_msg = e.errors()[0].get('msg', str(e))
             raise HTTPException(status_code=422, detail=f"Erro de validação: {error_msg}")
         raise HTTPException(status_code=400, detail=f"Erro ao criar transação: {str(e)}")
 
+@router.post("/import")
+async def import_user_transactions(
+    file: UploadFile = File(...),
+    format: Optional[str] = Form(None),
+    default_category: str = Form("Importado"),
+    encoding: str = Form("utf-8-sig"),
+    user_id: str = Header(..., alias="user-id"),
+    prisma: Prisma = Depends(get_prisma)
+):
+    """
+    Importa um extrato bancário (CSV ou OFX) em lote.
+
+    A resposta é um fluxo NDJSON com os erros por linha, o progresso a cada
+    bloco inserido e o resumo final.
+    """
+    try:
+        file_format = detect_format(file.filename, format)
+    except ValueError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+
+    # O upload é fechado ao fim do handler; copiamos para um arquivo próprio
+    # que é lido durante o streaming. A remoção fica numa BackgroundTask da
+    # resposta (roda depois do streaming, mesmo se o gerador falhar ou nem
+    # começar) e, se a cópia falhar, aqui mesmo.
+    target = tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_format}")
+    try:
+        with target:
+            await run_in_threadpool(shutil.copyfileobj, file.file, target)
+    except Exception:
+        remove_file(target.name)
+        raise
+
+    return StreamingResponse(
+        import_transactions(
+            prisma,
+            user_id,
+            target.name,
+            file_format,
+            default_category=default_category,
+            chunk_size=settings.import_chunk_size,
+            encoding=encoding
+        ),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(remove_file, target.name)
+    )
+
 @router.delete("/{transaction_id}")
 async def delete_transaction(
     transaction_id: str,
@@ -135,7 +203,10 @@ async def delete_transaction(
         if not transaction:
             raise HTTPException(status_code=404, detail="Transação não encontrada")
             
-        await prisma.transactions.delete(where={"id": transaction_id})
+        async with prisma.tx() as tx:
+            await tx.transactions.delete(where={"id": transaction_id})
+            await apply_transaction(tx, transaction, sign=-1)
+        notify_write(user_id)
         return {"message": "Transação deletada com sucesso"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -167,10 +238,14 @@ async def update_transaction(
         if isinstance(transaction_data["date"], str):
             transaction_data["date"] = datetime.fromisoformat(transaction_data["date"].replace("Z", "+00:00"))
         
-        result = await prisma.transactions.update(
-            where={"id": transaction_id},
-            data=transaction_data
-        )
+        async with prisma.tx() as tx:
+            result = await tx.transactions.update(
+                where={"id": transaction_id},
+                data=transaction_data
+            )
+            await apply_transaction(tx, existing, sign=-1)
+            await apply_transaction(tx, result)
+        notify_write(user_id)
         return result
     except Exception as e:
         if hasattr(e, 'errors'):
@@ -1,14 +1,25 @@
 from fastapi import APIRouter, HTTPException, Depends, Body, Request, Form
 from ..db.models import UserCreate, UserOut, UserUpdate, ProfileCreate, ProfileOut
 from ..db.prisma import get_prisma
+from ..core.auth import invalidate_user_cache
 from prisma import Prisma
-from ..utils.prisma import ensure_connection
+import logging
 import uuid
 from datetime import datetime
-from ..core.security import get_password_hash
+from ..services.passwords import client_limiter, enforce_rate_limit, hash_password
+from ..services.identity import (
+    find_user_by_phone,
+    find_profile_by_phone,
+    invalidate_phone,
+    invalidate_user
+)
+from ..utils.serialization import ORJSONResponse, to_rows
 from pydantic import BaseModel, EmailStr
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+USER_FIELDS = tuple(UserOut.model_fields)
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -27,36 +38,29 @@ async def get_user_by_phone(
     phone: str,
     prisma: Prisma = Depends(get_prisma)
 ):
-    await ensure_connection()
-    print(f"Buscando usuário com telefone: {phone}")
+    logger.debug("Buscando usuário com telefone: %s", phone)
     
     try:
-        # Buscar usuário com query raw
-        result = await prisma.query_raw(
-            "SELECT id, email, name, phone FROM users WHERE phone = $1",
-            phone.replace("@c.us", "").replace("+", "")
-        )
-        print("Resultado da query:", result)
+        # Buscar usuário no cache de identidade (consulta o banco só na primeira vez)
+        user = await find_user_by_phone(prisma, phone)
         
-        if not result or len(result) == 0:
+        if not user:
             raise HTTPException(
                 status_code=404,
                 detail="Usuário não encontrado"
             )
             
-        user = result[0]
         return UserResponse(
-            id=user["id"],
-            email=user["email"],
-            name=user["name"],
-            phone=user["phone"]
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            phone=user.phone
         )
         
     except HTTPException as he:
         raise he
     except Exception as e:
-        print(f"Erro inesperado: {str(e)}")
-        print(f"Tipo do erro: {type(e)}")
+        logger.exception("Erro inesperado ao buscar usuário por telefone")
         raise HTTPException(
             status_code=500,
             detail=f"Erro interno: {str(e)}"
@@ -68,15 +72,17 @@ async def register_user(
     prisma: Prisma = Depends(get_prisma)
 ):
     try:
-        print("Iniciando registro de usuário...")
+        logger.debug("Iniciando registro de usuário")
+        enforce_rate_limit(client_limiter, request.client.host if request.client else "unknown")
         
         # Ler dados
         request_data = await request.json()
-        print("Dados recebidos:", request_data)
+        
+        # Hash da senha fora do event loop (executor do bcrypt)
+        password_hash = await hash_password(request_data["password"])
         
         # Gerar ID único
         user_id = str(uuid.uuid4())
-        print(f"ID gerado: {user_id}")
         
         # Criar usuário
         new_user = await prisma.users.create(
@@ -85,7 +91,7 @@ async def register_user(
                 "email": request_data["email"],
                 "name": request_data["name"],
                 "phone": request_data["phone"],
-                "password": get_password_hash(request_data["password"]),
+                "password": password_hash,
                 "role": "USER",
                 "is_active": True,
                 "notification_email": True,
@@ -94,7 +100,8 @@ async def register_user(
                 "marketingEmails": False
             }
         )
-        print("Usuário criado com sucesso:", new_user.id)
+        logger.info("Usuário %s criado", new_user.id)
+        invalidate_phone(new_user.phone)
         
         return UserResponse(
             id=new_user.id,
@@ -103,8 +110,10 @@ async def register_user(
             phone=new_user.phone
         )
         
+    except HTTPException as he:
+        raise he
     except Exception as e:
-        print(f"Erro ao registrar usuário: {str(e)}")
+        logger.exception("Erro ao registrar usuário")
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao registrar usuário: {str(e)}"
@@ -117,10 +126,12 @@ async def read_users(
     prisma: Prisma = Depends(get_prisma)
 ):
     try:
-        return await prisma.users.find_many(
+        users = await prisma.users.find_many(
             skip=skip,
             take=limit,
         )
+        # Só os campos de UserOut (sem a senha), sem validar cada linha no pydantic
+        return ORJSONResponse(to_rows(users, USER_FIELDS))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -146,6 +157,10 @@ async def update_user(
             where={"id": user_id},
             data=update_data
         )
+        invalidate_user(user_id)
+        invalidate_user_cache(user_id)
+        if updated_user:
+            invalidate_phone(updated_user.phone)
         return updated_user
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -154,6 +169,8 @@ async def update_user(
 async def delete_user(user_id: str, prisma: Prisma = Depends(get_prisma)):
     try:
         user = await prisma.users.delete(where={"id": user_id})
+        invalidate_user(user_id)
+        invalidate_user_cache(user_id)
         return user
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -165,19 +182,13 @@ async def create_user_profile(
     prisma: Prisma = Depends(get_prisma)
 ):
     try:
-        print("Received request:")
-        print(f"user_id: {user_id}")
-        print(f"profile data: {profile}")
+        logger.debug("Criando perfil do usuário %s: %s", user_id, profile)
 
         # Verificar o estado atual do banco
         existing_user = await prisma.users.find_unique(
             where={"id": user_id},
             include={"profile": True}
         )
-        print(f"Existing user: {existing_user}")
-        
-        if existing_user and existing_user.profile:
-            print(f"Existing profile: {existing_user.profile}")
         
         now = datetime.utcnow()
         
@@ -185,7 +196,6 @@ async def create_user_profile(
             raise HTTPException(status_code=404, detail="User not found")
             
         try:
-            print("Attempting to create new profile...")
             new_profile = await prisma.profiles.create({
                 "id": user_id,
                 "phone": profile.phone,
@@ -194,9 +204,10 @@ async def create_user_profile(
                 "created_at": now,
                 "updated_at": now
             })
-            print(f"Successfully created new profile: {new_profile}")
+            logger.info("Perfil %s criado", new_profile.id)
+            invalidate_phone(profile.phone)
         except Exception as create_error:
-            print(f"Error creating profile: {create_error}")
+            logger.warning("Error creating profile: %s", create_error)
             raise HTTPException(status_code=400, detail=str(create_error))
         
         # Buscar usuário atualizado
@@ -204,12 +215,10 @@ async def create_user_profile(
             where={"id": user_id},
             include={"profile": True}
         )
-        print(f"Final user state: {updated_user}")
         
         return updated_user
     except Exception as e:
-        print(f"Error: {str(e)}")
-        print(f"Error type: {type(e)}")
+        logger.warning("Error creating profile for %s: %s (%s)", user_id, e, type(e).__name__)
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/check/{phone}")
@@ -218,25 +227,21 @@ async def check_user_by_phone(
     prisma: Prisma = Depends(get_prisma)
 ):
     try:
-        print(f"Verificando usuário com telefone: {phone}")
-        # Buscar em users
-        user = await prisma.users.find_first(
-            where={"phone": phone}
-        )
-        print("Usuário encontrado:", user)
+        logger.debug("Verificando usuário com telefone: %s", phone)
+        # Buscar em users (cache de identidade)
+        user = await find_user_by_phone(prisma, phone)
+        logger.debug("Usuário encontrado: %s", user)
 
         # Buscar em profiles
-        profile = await prisma.profiles.find_first(
-            where={"phone": phone}
-        )
-        print("Perfil encontrado:", profile)
+        profile = await find_profile_by_phone(prisma, phone)
+        logger.debug("Perfil encontrado: %s", profile)
 
         return {
             "user": user,
             "profile": profile
         }
     except Exception as e:
-        print(f"Erro ao verificar usuário: {str(e)}")
+        logger.exception("Erro ao verificar usuário")
         return {"error": str(e)}
 
 @router.get("/profiles/all")
@@ -257,5 +262,5 @@ async def list_all_profiles(
             } for p in profiles]
         }
     except Exception as e:
-        print(f"Erro ao listar profiles: {str(e)}")
+        logger.exception("Erro ao listar profiles")
         return {"error": str(e)}
\ No newline at end of file
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException, Request, Depends
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from ..services.whatsapp import WhatsAppService
 from ..db.models import (
     Message, 
@@ -12,67 +12,42 @@ from ..db.models import (
 )
 from ..core.config import settings
 from ..core.auth import get_current_user
-from ..db.prisma import get_prisma
-from ..utils.prisma import ensure_connection
+from ..db.prisma import get_prisma, create_prisma
+from ..services.ledger import apply_transaction, get_balance, get_rollups, notify_write
+from ..services.aggregates import totals_by_category, rollup_totals_by_category
+from ..services.pagination import fetch_page
+from ..services.cache import TTLCache
+from ..services.financial_context import build_financial_context
+from ..services.ai_service import FinancialAdvisorService, get_advisor
+from ..services.categories import resolve_category_id
+from ..services.identity import find_user_by_phone, normalize_phone
+from ..services.metrics import WEBHOOK_DURATION, track
+from ..utils.formatting import format_brl, format_brl_many, format_date, format_dates, format_month
+from ..utils.periods import PERIOD_NAMES, covers_whole_months, period_range, rollup_months
 from prisma import Prisma
+import asyncio
 import httpx
+import json
+import logging
+import time
 import uuid
-from datetime import datetime, timezone, timedelta
+from datetime import datetime
 from decimal import Decimal
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Dict, Any
-import locale
-
-# Configurar locale para português
-try:
-    locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
-except:
-    try:
-        locale.setlocale(locale.LC_TIME, 'Portuguese_Brazil')
-    except:
-        locale.setlocale(locale.LC_TIME, '')
-
-# Mapeamento de meses em inglês para português
-MESES = {
-    'January': 'Janeiro',
-    'February': 'Fevereiro',
-    'March': 'Março',
-    'April': 'Abril',
-    'May': 'Maio',
-    'June': 'Junho',
-    'July': 'Julho',
-    'August': 'Agosto',
-    'September': 'Setembro',
-    'October': 'Outubro',
-    'November': 'Novembro',
-    'December': 'Dezembro'
-}
-
-# Mapeamento reverso para ordenação
-MESES_REVERSE = {
-    'Janeiro': 1,
-    'Fevereiro': 2,
-    'Março': 3,
-    'Abril': 4,
-    'Maio': 5,
-    'Junho': 6,
-    'Julho': 7,
-    'Agosto': 8,
-    'Setembro': 9,
-    'Outubro': 10,
-    'Novembro': 11,
-    'Dezembro': 12
-}
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Cursor da próxima página do extrato, por telefone
+statement_cursors = TTLCache(maxsize=10000, ttl=settings.statement_cursor_ttl)
+
 whatsapp = WhatsAppService(
     base_url=settings.whatsapp_service_url,
     secret_key=settings.whatsapp_secret_key
 )
 
-print("\n=== WHATSAPP ROUTER ===")
-print(f"Service URL: {settings.whatsapp_service_url}")
-print(f"Secret Key: {'*' * len(settings.whatsapp_secret_key)}")
+logger.info("WhatsApp service URL: %s", settings.whatsapp_service_url)
 
 class WebhookRequest(BaseModel):
     type: MessageType
@@ -85,6 +60,10 @@ class WebhookRequest(BaseModel):
     transaction_id: Optional[str] = None
     date: Optional[str] = None
     financialContext: Optional[Dict[str, Any]] = None
+    # Texto do usuário (define o modo dos conselhos: "conselhos", "dicas"...)
+    message: Optional[str] = None
+    # FINANCIAL_ADVICE: responder em Server-Sent Events, à medida que o texto é gerado
+    stream: bool = False
 
     model_config = {
         "json_encoders": {
@@ -136,85 +115,171 @@ class WebhookResponse(BaseModel):
         }
     }
 
+class AdviceRequest(BaseModel):
+    user_id: str
+    message: Optional[str] = None
+    financialContext: Optional[Dict[str, Any]] = None
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def advice_events(
+    context: Dict[str, Any],
+    advisor: Optional[FinancialAdvisorService] = None,
+    started: Optional[float] = None
+):
+    """
+    Eventos SSE: start (imediato), token (cada trecho gerado), done ou error.
+
+    Com `started` (perf_counter do início do webhook), o tempo até o último
+    evento entra na latência do comando FINANCIAL_ADVICE do webhook.
+    """
+    outcome = "error"
+    try:
+        yield _sse("start", {})
+        try:
+            async for text in (advisor or get_advisor()).stream_analysis(context):
+                yield _sse("token", {"text": text})
+            yield _sse("done", {})
+            outcome = "ok"
+        except asyncio.TimeoutError:
+            yield _sse("error", {"error": "Tempo esgotado ao gerar a análise financeira"})
+        except Exception as e:
+            logger.exception("Erro no streaming de conselhos")
+            yield _sse("error", {"error": str(e)})
+    finally:
+        if started is not None:
+            WEBHOOK_DURATION.observe(time.perf_counter() - started, MessageType.FINANCIAL_ADVICE.value, outcome)
+
+def advice_stream_response(context: Dict[str, Any], started: Optional[float] = None) -> StreamingResponse:
+    return StreamingResponse(
+        advice_events(context, started=started),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def advice_context(
+    prisma: Prisma,
+    user_id: str,
+    message: Optional[str],
+    financial_context: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Usa o contexto financeiro enviado pelo bot ou monta a partir dos consolidados"""
+    return {
+        "message": message,
+        "financialContext": financial_context or await build_financial_context(prisma, user_id)
+    }
+
 @router.post("/webhook")
 async def webhook(
     request: WebhookRequest,
     prisma: Prisma = Depends(get_prisma)
 ) -> WebhookResponse:
+    if request.stream and request.type == MessageType.FINANCIAL_ADVICE:
+        # Medido até o fim do streaming (ver advice_events), não só até a resposta
+        started = time.perf_counter()
+        try:
+            user = await find_user_by_phone(prisma, request.phone)
+            if not user:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Usuário não encontrado para o telefone {normalize_phone(request.phone)}"
+                )
+            context = await advice_context(prisma, user.id, request.message, request.financialContext)
+        except Exception:
+            WEBHOOK_DURATION.observe(time.perf_counter() - started, request.type.value, "error")
+            raise
+        return advice_stream_response(context, started=started)
+    return await process_webhook(request, prisma)
+
+@router.post("/advice/stream")
+async def stream_advice(
+    request: AdviceRequest,
+    prisma: Prisma = Depends(get_prisma)
+):
+    """Conselhos financeiros em Server-Sent Events, trecho a trecho"""
     try:
-        await ensure_connection()
-        
-        # Formatar número do telefone
-        phone = request.phone
-        if phone.startswith("+"):
-            phone = phone[1:]  # Remove o + se existir
+        context = await advice_context(prisma, request.user_id, request.message, request.financialContext)
+    except Exception as e:
+        logger.exception("Erro ao buscar contexto financeiro")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao buscar contexto financeiro: {str(e)}"
+        )
+    return advice_stream_response(context)
+
+async def process_webhook(
+    request: WebhookRequest,
+    prisma: Prisma,
+    user: Any = None,
+    category_id: Optional[str] = None
+) -> WebhookResponse:
+    """Processa uma mensagem do bot, medindo a latência por tipo de comando"""
+    with track(WEBHOOK_DURATION, getattr(request.type, "value", str(request.type))):
+        return await _process_webhook(request, prisma, user, category_id)
+
+async def _process_webhook(
+    request: WebhookRequest,
+    prisma: Prisma,
+    user: Any = None,
+    category_id: Optional[str] = None
+) -> WebhookResponse:
+    """
+    Processa uma mensagem do bot.
+
+    Usuário e categoria podem vir já resolvidos (ex.: webhook em lote); caso
+    contrário são buscados aqui.
+    """
+    try:
+        phone = normalize_phone(request.phone)
         
-        print(f"\n=== WEBHOOK RECEBIDO ===")
-        print(f"Telefone: {phone}")
-        print(f"Tipo: {request.type}")
+        logger.debug("Webhook recebido: telefone %s, tipo %s", phone, request.type)
         
         # Verificar se o usuário existe
-        user = await prisma.users.find_first(
-            where={"phone": phone}
-        )
+        if user is None:
+            user = await find_user_by_phone(prisma, phone)
         
         if not user:
-            print(f"Usuário não encontrado para o telefone: {phone}")
+            logger.info("Usuário não encontrado para o telefone: %s", phone)
             raise HTTPException(
                 status_code=404,
                 detail=f"Usuário não encontrado para o telefone {phone}"
             )
 
-        print(f"Usuário encontrado: {user.name}")
+        logger.debug("Usuário encontrado: %s", user.id)
         
         # Processar comandos
         if request.type in [MessageType.INCOME, MessageType.EXPENSE]:
-            print("\n=== PROCESSANDO TRANSAÇÃO ===")
             amount = Decimal(str(request.amount)) if request.amount else Decimal('0')
             if request.type == MessageType.EXPENSE:
                 amount = -amount  # Torna o valor negativo para despesas
             
-            # Primeiro, verificar se a categoria existe
-            category = await prisma.categories.find_first(
-                where={
-                    "user_id": request.user_id,
-                    "name": request.category,
-                    "type": request.type
-                }
-            )
-            
-            # Se não existir, criar
-            if not category:
-                category = await prisma.categories.create(
-                    data={
-                        "id": str(uuid.uuid4()),
-                        "user_id": request.user_id,
-                        "name": request.category,
-                        "type": request.type
-                    }
+            # Categoria via cache (criada com upsert se não existir)
+            if category_id is None:
+                category_id = await resolve_category_id(
+                    prisma, request.user_id, request.category, request.type
                 )
             
-            # Ajustar para timezone de São Paulo (UTC-3)
-            tz_sp = timezone(timedelta(hours=-3))
-            current_time = datetime.now(tz_sp)
-            
             # Criar transação
             transaction_data = {
                 "id": str(uuid.uuid4()),
                 "user_id": request.user_id,
                 "amount": str(amount),
                 "description": request.description,
-                "category": category.name,
+                "category": request.category,
                 "type": request.type,
                 "date": datetime.fromisoformat(request.date.replace('Z', '+00:00')).replace(hour=0, minute=0, second=0, microsecond=0),
-                "categoryId": category.id
+                "categoryId": category_id
             }
             
-            print(f"Dados da transação: {transaction_data}")
+            logger.debug("Dados da transação: %s", transaction_data)
             
             # Registrar transação
-            transaction = await prisma.transactions.create(data=transaction_data)
-            print(f"Transação registrada: {transaction}")
+            async with prisma.tx() as tx:
+                transaction = await tx.transactions.create(data=transaction_data)
+                await apply_transaction(tx, transaction)
+            notify_write(transaction.user_id)
+            logger.debug("Transação %s registrada", transaction.id)
             
             # Gerar mensagem de confirmação
             message_context = {
@@ -224,75 +289,80 @@ async def webhook(
                 "amount": abs(float(transaction.amount)),
                 "description": transaction.description,
                 "category": transaction.category,
-                "date": transaction.date.strftime("%d/%m/%Y")
+                "date": format_date(transaction.date)
             }
             
-            print(f"Contexto da mensagem: {message_context}")
+            logger.debug("Contexto da mensagem: %s", message_context)
             message = await whatsapp.generate_response(message_context)
-            print(f"Mensagem gerada: {message}")
             
             return WebhookResponse(message=message)
             
         elif request.type == MessageType.BALANCE:
-            transactions = await prisma.transactions.find_many(
-                where={"user_id": user.id}
-            )
-            if not transactions:
+            # Saldo consolidado (user_balances), sem varrer o histórico
+            ledger = await get_balance(prisma, user.id)
+            if not ledger or ledger.row_count == 0:
                 message_context = {"type": "NO_TRANSACTIONS_BALANCE"}
                 message = await whatsapp.generate_response(message_context)
                 return WebhookResponse(message=message)
 
-            # Calcular saldo corretamente
-            saldo = Decimal('0')
-            print("\n=== DETALHAMENTO DO SALDO ===")
-            for t in transactions:
-                valor = Decimal(str(t.amount))
-                print(f"{'Receita' if valor > 0 else 'Despesa'}: {t.description} = R$ {abs(float(valor)):.2f}")
-                saldo += valor
-            
-            print(f"Saldo Final: R$ {float(saldo):.2f}")
+            saldo = Decimal(str(ledger.balance))
             
             # Formatar mensagem
             status_emoji = "✅" if saldo >= 0 else "❌"
-            total_receitas = sum(float(t.amount) for t in transactions if float(t.amount) > 0)
-            total_despesas = abs(sum(float(t.amount) for t in transactions if float(t.amount) < 0))
             
             message_context = {
                 "type": "BALANCE",
                 "balance": abs(float(saldo)),
                 "status_emoji": status_emoji,
                 "status": "Positivo" if saldo >= 0 else "Negativo",
-                "total_receitas": total_receitas,
-                "total_despesas": total_despesas
+                "total_receitas": float(ledger.income_total),
+                "total_despesas": float(ledger.expense_total)
             }
             
             message = await whatsapp.generate_response(message_context)
             return WebhookResponse(message=message)
             
-        elif request.type == MessageType.STATEMENT:
-            transactions = await prisma.transactions.find_many(
-                where={"user_id": user.id},
-                order={"date": "desc"}
+        elif request.type in [MessageType.STATEMENT, MessageType.STATEMENT_MORE]:
+            # Extrato paginado: "extrato" mostra a primeira página e "mais" continua do cursor salvo
+            cursor = None
+            if request.type == MessageType.STATEMENT_MORE:
+                cursor = statement_cursors.get(phone)
+                if not cursor:
+                    message_context = {"type": "NO_MORE_TRANSACTIONS_STATEMENT"}
+                    message = await whatsapp.generate_response(message_context)
+                    return WebhookResponse(message=message)
+            
+            page_size = settings.statement_page_size
+            transactions, next_cursor = await fetch_page(
+                prisma, {"user_id": user.id}, cursor, page_size
             )
+            if next_cursor:
+                statement_cursors.set(phone, next_cursor)
+            else:
+                statement_cursors.pop(phone)
+            
             if not transactions:
                 message_context = {"type": "NO_TRANSACTIONS_STATEMENT"}
                 message = await whatsapp.generate_response(message_context)
                 return WebhookResponse(message=message)
             
-            # Calcular totais
-            total_receitas = sum(float(t.amount) for t in transactions if float(t.amount) > 0)
-            total_despesas = abs(sum(float(t.amount) for t in transactions if float(t.amount) < 0))
+            # Totais do saldo consolidado (user_balances)
+            ledger = await get_balance(prisma, user.id)
+            total_receitas = float(ledger.income_total) if ledger else 0.0
+            total_despesas = float(ledger.expense_total) if ledger else 0.0
             saldo = total_receitas - total_despesas
             
-            # Formatar lista de transações
+            # Formatar lista de transações da página (valores e datas formatados em lote)
+            valores = format_brl_many(abs(t.amount) for t in transactions)
+            datas = format_dates(t.date for t in transactions)
             transactions_list = "\n\n".join(
                 f"{'📥' if t.type == 'INCOME' else '📤'} *{t.category}*\n"
-                f"💰 Valor: R$ {abs(float(t.amount)):.2f}\n"
+                f"💰 Valor: R$ {valor}\n"
                 f"📝 Descrição: {t.description}\n"
-                f"📅 Data: {t.date.strftime('%d/%m/%Y')}\n"
+                f"📅 Data: {data}\n"
                 f"🔑 ID: #{t.id[-6:].upper()}\n"
                 f"━━━━━━━━━━━━━━━"
-                for t in transactions
+                for t, valor, data in zip(transactions, valores, datas)
             )
             
             message_context = {
@@ -300,7 +370,9 @@ async def webhook(
                 "total_receitas": total_receitas,
                 "total_despesas": total_despesas,
                 "saldo": saldo,
-                "transactions_list": transactions_list
+                "transactions_list": transactions_list,
+                "has_more": next_cursor is not None,
+                "page_size": page_size
             }
             
             message = await whatsapp.generate_response(message_context)
@@ -308,71 +380,44 @@ async def webhook(
             
         elif request.type == MessageType.REPORT:
             try:
-                tz_sp = timezone(timedelta(hours=-3))
-                now = datetime.now(tz_sp)
-                
-                # Definir período de busca
+                # Definir período de busca [início, fim) no fuso do usuário
                 period = request.period
-                print(f"\n=== GERANDO RELATÓRIO ===")
-                print(f"Período recebido: {period}")
-                print(f"Usuário: {user.id}")
+                window = period_range(period)
+                logger.debug("Relatório %s do usuário %s: %s até %s", period, user.id, window.start, window.end)
                 
-                # Mapear nomes amigáveis
-                period_names = {
-                    PeriodType.DAILY: "Diário",
-                    PeriodType.WEEKLY: "Semanal", 
-                    PeriodType.MONTHLY: "Mensal",
-                    PeriodType.YEARLY: "Anual"
-                }
-                
-                # Definir data inicial
-                if period == PeriodType.MONTHLY:
-                    start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                elif period == PeriodType.YEARLY:
-                    start_date = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-                elif period == PeriodType.WEEKLY:
-                    start_date = now - timedelta(days=7)
-                else:  # DAILY
-                    start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
+                # Meses inteiros vêm dos consolidados mensais; dia/semana são agregados no banco
+                if covers_whole_months(period):
+                    rows = await rollup_totals_by_category(
+                        prisma, user.id, *rollup_months(window)
+                    )
+                else:
+                    rows = await totals_by_category(prisma, user.id, window.start, window.end)
                 
-                print(f"Data inicial: {start_date}")
-                
-                # Buscar transações do período
-                transactions = await prisma.transactions.find_many(
-                    where={
-                        "user_id": user.id,
-                        "date": {
-                            "gte": start_date
-                        }
-                    },
-                    order={"date": "desc"}
-                )
+                logger.debug("Grupos encontrados: %s", len(rows))
                 
-                print(f"Transações encontradas: {len(transactions)}")
-                
-                if not transactions:
+                if not rows:
                     message_context = {"type": "NO_TRANSACTIONS"}
                     message = await whatsapp.generate_response(message_context)
                     return WebhookResponse(message=message)
                 
                 # Calcular totais
-                receitas = sum(float(t.amount) for t in transactions if float(t.amount) > 0)
-                despesas = abs(sum(float(t.amount) for t in transactions if float(t.amount) < 0))
+                receitas = float(sum(r["total"] for r in rows if r["type"] == "INCOME"))
+                despesas = float(sum(r["total"] for r in rows if r["type"] == "EXPENSE"))
                 saldo = receitas - despesas
                 
                 # Calcular médias
-                num_receitas = len([t for t in transactions if float(t.amount) > 0])
-                num_despesas = len([t for t in transactions if float(t.amount) < 0])
+                num_receitas = sum(r["count"] for r in rows if r["type"] == "INCOME")
+                num_despesas = sum(r["count"] for r in rows if r["type"] == "EXPENSE")
                 media_receitas = receitas / num_receitas if num_receitas > 0 else 0
                 media_despesas = despesas / num_despesas if num_despesas > 0 else 0
                 
                 # Agrupar por categoria
                 categorias = {}
-                for t in transactions:
-                    if t.category not in categorias:
-                        categorias[t.category] = {"total": 0, "count": 0}
-                    categorias[t.category]["total"] += abs(float(t.amount))
-                    categorias[t.category]["count"] += 1
+                for r in rows:
+                    if r["category"] not in categorias:
+                        categorias[r["category"]] = {"total": 0, "count": 0}
+                    categorias[r["category"]]["total"] += float(r["total"])
+                    categorias[r["category"]]["count"] += r["count"]
                 
                 # Ordenar categorias por valor
                 top_categorias = sorted(
@@ -383,8 +428,11 @@ async def webhook(
                 
                 # Formatar lista de categorias
                 lista_categorias = "\n".join(
-                    f"• {cat}: R$ {dados['total']:.2f} ({dados['count']} transações)" 
-                    for cat, dados in top_categorias
+                    f"• {cat}: R$ {valor} ({dados['count']} transações)"
+                    for (cat, dados), valor in zip(
+                        top_categorias,
+                        format_brl_many(dados["total"] for _, dados in top_categorias)
+                    )
                 )
 
                 # Determinar tendência do saldo
@@ -392,7 +440,7 @@ async def webhook(
                 
                 message_context = {
                     "type": "REPORT",
-                    "period_name": period_names[period],
+                    "period_name": PERIOD_NAMES[period],
                     "receitas": receitas,
                     "num_receitas": num_receitas,
                     "despesas": despesas,
@@ -408,13 +456,13 @@ async def webhook(
                 return WebhookResponse(message=message)
                 
             except ValueError as ve:
-                print(f"Erro de validação: {str(ve)}")
+                logger.warning("Erro de validação no relatório: %s", ve)
                 raise HTTPException(
                     status_code=422,
                     detail=f"Erro de validação: {str(ve)}"
                 )
             except Exception as e:
-                print(f"Erro ao gerar relatório: {str(e)}")
+                logger.exception("Erro ao gerar relatório")
                 raise HTTPException(
                     status_code=500,
                     detail=f"Erro ao gerar relatório: {str(e)}"
@@ -427,15 +475,10 @@ async def webhook(
                     detail="Categoria não especificada"
                 )
             
-            transactions = await prisma.transactions.find_many(
-                where={
-                    "user_id": user.id,
-                    "category": request.category
-                },
-                order={"date": "desc"}
-            )
+            # Totais mensais da categoria (transaction_rollups)
+            rollups = await get_rollups(prisma, user.id, category=request.category)
             
-            if not transactions:
+            if not rollups:
                 message_context = {
                     "type": "NO_TRANSACTIONS_CATEGORY",
                     "category": request.category
@@ -444,55 +487,33 @@ async def webhook(
                 return WebhookResponse(message=message)
             
             # Calcular totais
-            total = sum(abs(float(t.amount)) for t in transactions)
-            media = total / len(transactions)
-            ultima = abs(float(transactions[0].amount))
+            total = sum(float(r.total) for r in rollups)
+            media = total / sum(r.count for r in rollups)
+            
+            # Última transação da categoria
+            last_transaction = await prisma.transactions.find_first(
+                where={
+                    "user_id": user.id,
+                    "category": request.category
+                },
+                order={"date": "desc"}
+            )
+            ultima = abs(float(last_transaction.amount)) if last_transaction else 0
             
-            # Agrupar por mês
+            # Agrupar por ano/mês (o mês do consolidado já está no fuso de São Paulo)
             gastos_por_mes = {}
-            for t in transactions:
-                # Converter para o timezone de São Paulo
-                tz_sp = timezone(timedelta(hours=-3))
-                data_sp = t.date.astimezone(tz_sp)
-                
-                # Obter o mês em inglês usando locale en_US
-                locale.setlocale(locale.LC_TIME, 'en_US.UTF-8')
-                mes_original = data_sp.strftime("%B").capitalize()
-                print(f"\n=== DEBUG MÊS ===")
-                print(f"Data original: {t.date}")
-                print(f"Data SP: {data_sp}")
-                print(f"Mês original (en_US): {mes_original}")
-                print(f"Mapeamento: {MESES}")
-                
-                try:
-                    mes = MESES[mes_original]  # Usar o mapeamento para português
-                    print(f"Mês traduzido: {mes}")
-                    print(f"Codificação do mês: {mes.encode('utf-8')}")
-                except KeyError:
-                    print(f"Erro: Mês '{mes_original}' não encontrado no mapeamento")
-                    continue
-                
-                if mes not in gastos_por_mes:
-                    gastos_por_mes[mes] = 0
-                gastos_por_mes[mes] += abs(float(t.amount))
-            
-            print("\n=== DEBUG GASTOS POR MÊS ===")
-            print(f"Gastos por mês: {gastos_por_mes}")
-            
-            # Formatar lista de meses
-            meses_list = ""
-            for mes, valor in sorted(gastos_por_mes.items(), key=lambda x: MESES_REVERSE[x[0]]):
-                linha = f"• {mes}: R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-                print(f"\n=== DEBUG LINHA ===")
-                print(f"Mês: {mes}")
-                print(f"Valor: {valor}")
-                print(f"Linha formatada: {linha}")
-                print(f"Codificação da linha: {linha.encode('utf-8')}")
-                meses_list += linha + "\n"
-            
-            print("\n=== DEBUG LISTA FINAL ===")
-            print(f"Lista de meses: {meses_list}")
-            print(f"Codificação da lista: {meses_list.encode('utf-8')}")
+            for r in rollups:
+                gastos_por_mes[r.month] = gastos_por_mes.get(r.month, 0) + float(r.total)
+            
+            # Formatar lista de meses em ordem cronológica
+            meses = sorted(gastos_por_mes)
+            meses_list = "".join(
+                f"• {format_month(mes)}: R$ {valor}\n"
+                for mes, valor in zip(
+                    meses,
+                    format_brl_many(gastos_por_mes[mes] for mes in meses)
+                )
+            )
             
             message_context = {
                 "type": "CATEGORY_REPORT",
@@ -522,18 +543,10 @@ async def webhook(
             return WebhookResponse(message=message)
             
         elif request.type == MessageType.FINANCIAL_ADVICE:
-            if not request.financialContext:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Contexto financeiro não fornecido"
-                )
-            
-            message_context = {
-                "type": "FINANCIAL_ADVICE",
-                "userName": user.name,
-                "financialContext": request.financialContext
-            }
-            message = await whatsapp.generate_response(message_context)
+            # Análise completa (em cache enquanto as finanças não mudarem);
+            # com "stream": true o webhook responde em SSE
+            context = await advice_context(prisma, user.id, request.message, request.financialContext)
+            message = await get_advisor().analisar_transacoes(context)
             return WebhookResponse(message=message)
             
         else:
@@ -542,7 +555,7 @@ async def webhook(
     except HTTPException as he:
         raise he
     except Exception as e:
-        print(f"Erro no webhook: {str(e)}")
+        logger.exception("Erro no webhook")
         if hasattr(e, 'errors'):
             error_msg = e.errors()[0].get('msg', str(e))
             raise HTTPException(
@@ -554,6 +567,91 @@ async def webhook(
             detail=f"Erro no webhook: {str(e)}"
         )
 
+@router.post("/webhook/batch")
+async def webhook_batch(
+    requests: List[WebhookRequest],
+    prisma: Prisma = Depends(get_prisma)
+) -> List[WebhookResponse]:
+    """
+    Processa várias mensagens do bot em uma única chamada.
+
+    Usuários e categorias são resolvidos uma vez para o lote inteiro.
+    Essas buscas e as mensagens de telefones diferentes rodam em paralelo,
+    limitadas pelo mesmo WEBHOOK_BATCH_CONCURRENCY; as mensagens de um mesmo
+    telefone mantêm a ordem.
+    As respostas seguem a ordem da requisição.
+    """
+    if len(requests) > settings.webhook_batch_max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lote maior que o limite de {settings.webhook_batch_max_size} mensagens"
+        )
+    semaphore = asyncio.Semaphore(settings.webhook_batch_concurrency)
+
+    async def bounded(func, *args):
+        async with semaphore:
+            return await func(*args)
+
+    try:
+        # Usuários do lote, um por telefone distinto (via cache de identidade)
+        phones = list({normalize_phone(r.phone) for r in requests})
+        found = await asyncio.gather(*(bounded(find_user_by_phone, prisma, phone) for phone in phones))
+        users = {phone: user for phone, user in zip(phones, found) if user}
+        
+        # Categorias distintas das transações do lote, resolvidas uma vez cada
+        # (se alguma falhar, a mensagem tenta de novo e reporta o próprio erro)
+        keys = list({
+            (r.user_id, r.category, r.type.value)
+            for r in requests
+            if r.type in [MessageType.INCOME, MessageType.EXPENSE] and normalize_phone(r.phone) in users
+        })
+        resolved = await asyncio.gather(
+            *(bounded(resolve_category_id, prisma, *key) for key in keys),
+            return_exceptions=True
+        )
+        categories = {
+            key: category_id
+            for key, category_id in zip(keys, resolved)
+            if not isinstance(category_id, BaseException)
+        }
+    except Exception as e:
+        logger.exception("Erro no webhook em lote")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro no webhook em lote: {str(e)}"
+        )
+    
+    responses: List[Optional[WebhookResponse]] = [None] * len(requests)
+    
+    # Agrupar por telefone preservando a ordem de chegada
+    by_phone: Dict[str, List[int]] = {}
+    for index, r in enumerate(requests):
+        by_phone.setdefault(normalize_phone(r.phone), []).append(index)
+    
+    async def run_phone(phone: str, indexes: List[int]):
+        if phone not in users:
+            for index in indexes:
+                responses[index] = WebhookResponse(
+                    message=f"Usuário não encontrado para o telefone {phone}",
+                    success=False
+                )
+            return
+        async with semaphore:
+            for index in indexes:
+                r = requests[index]
+                try:
+                    responses[index] = await process_webhook(
+                        r,
+                        prisma,
+                        user=users[phone],
+                        category_id=categories.get((r.user_id, r.category, r.type.value))
+                    )
+                except HTTPException as he:
+                    responses[index] = WebhookResponse(message=str(he.detail), success=False)
+    
+    await asyncio.gather(*(run_phone(phone, indexes) for phone, indexes in by_phone.items()))
+    return responses
+
 @router.post("/send")
 async def send_message(message: Message):
     try:
@@ -568,12 +666,10 @@ async def send_message(message: Message):
 @router.get("/qr", response_class=HTMLResponse)
 async def get_qr():
     try:
-        print("\n=== GERANDO QR CODE ===")
         qr_data = await whatsapp.get_qr()
-        print("QR Code gerado com sucesso")
         return qr_data
     except Exception as e:
-        print(f"Erro ao gerar QR code: {str(e)}")
+        logger.error("Erro ao gerar QR code: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao gerar QR code: {str(e)}"
@@ -582,7 +678,6 @@ async def get_qr():
 
 @router.get("/auth")
 async def get_whatsapp_auth(prisma: Prisma = Depends(get_prisma)):
-    await ensure_connection()
     auth = await prisma.whatsapp_auth.find_first()
     if not auth:
         return {"credentials": None}
@@ -590,7 +685,6 @@ async def get_whatsapp_auth(prisma: Prisma = Depends(get_prisma)):
 
 @router.post("/auth")
 async def save_whatsapp_auth(data: dict, prisma: Prisma = Depends(get_prisma)):
-    await ensure_connection()
     auth = await prisma.whatsapp_auth.find_first()
     if not auth:
         auth = await prisma.whatsapp_auth.create(
@@ -609,46 +703,27 @@ async def save_whatsapp_auth(data: dict, prisma: Prisma = Depends(get_prisma)):
 async def get_weekly_report(user_id: int) -> Dict[str, Any]:
     """Gera relatório semanal de gastos"""
     try:
-        # Obter data atual no timezone de São Paulo
-        tz_sp = timezone(timedelta(hours=-3))
-        now = datetime.now(tz_sp)
-        
-        # Calcular início da semana (segunda-feira)
-        start_of_week = now - timedelta(days=now.weekday())
-        start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
+        # Semana atual (segunda-feira até a segunda-feira seguinte, exclusiva)
+        start_of_week, end_of_week = period_range(PeriodType.WEEKLY)
         
-        # Calcular fim da semana (domingo)
-        end_of_week = start_of_week + timedelta(days=6, hours=23, minutes=59, seconds=59)
+        logger.debug("Relatório semanal: %s até %s", start_of_week, end_of_week)
         
-        print(f"\n=== RELATÓRIO SEMANAL ===")
-        print(f"Início da semana: {start_of_week}")
-        print(f"Fim da semana: {end_of_week}")
-        
-        # Buscar transações da semana atual
-        transactions = await prisma.transactions.find_many(
-            where={
-                "user_id": user_id,
-                "date": {
-                    "gte": start_of_week,
-                    "lte": end_of_week
-                }
-            },
-            order={"date": "desc"}
-        )
+        # Totais da semana atual agregados no banco
+        rows = await totals_by_category(create_prisma(), user_id, start_of_week, end_of_week)
         
-        if not transactions:
+        if not rows:
             return {
                 "type": "NO_TRANSACTIONS"
             }
         
         # Calcular totais
-        receitas = sum(float(t.amount) for t in transactions if float(t.amount) > 0)
-        despesas = abs(sum(float(t.amount) for t in transactions if float(t.amount) < 0))
+        receitas = float(sum(r["total"] for r in rows if r["type"] == "INCOME"))
+        despesas = float(sum(r["total"] for r in rows if r["type"] == "EXPENSE"))
         saldo = receitas - despesas
         
         # Contar transações
-        total_receitas = len([t for t in transactions if float(t.amount) > 0])
-        total_despesas = len([t for t in transactions if float(t.amount) < 0])
+        total_receitas = sum(r["count"] for r in rows if r["type"] == "INCOME")
+        total_despesas = sum(r["count"] for r in rows if r["type"] == "EXPENSE")
         
         # Calcular médias
         media_receita = receitas / total_receitas if total_receitas > 0 else 0
@@ -656,11 +731,11 @@ async def get_weekly_report(user_id: int) -> Dict[str, Any]:
         
         # Agrupar por categoria
         categorias = {}
-        for t in transactions:
-            if t.category not in categorias:
-                categorias[t.category] = {"amount": 0, "count": 0}
-            categorias[t.category]["amount"] += abs(float(t.amount))
-            categorias[t.category]["count"] += 1
+        for r in rows:
+            if r["category"] not in categorias:
+                categorias[r["category"]] = {"amount": 0, "count": 0}
+            categorias[r["category"]]["amount"] += float(r["total"])
+            categorias[r["category"]]["count"] += r["count"]
         
         # Ordenar categorias por valor
         top_categorias = [
@@ -680,7 +755,7 @@ async def get_weekly_report(user_id: int) -> Dict[str, Any]:
             "total_despesas": total_despesas
         }
     except Exception as e:
-        print(f"Erro ao gerar relatório semanal: {str(e)}")
+        logger.exception("Erro ao gerar relatório semanal")
         return {
             "type": "ERROR",
             "error": str(e)
@@ -692,75 +767,11 @@ async def get_financial_context(
     prisma: Prisma = Depends(get_prisma)
 ):
     try:
-        await ensure_connection()
-        
-        # Buscar transações do mês atual
-        tz_sp = timezone(timedelta(hours=-3))
-        now = datetime.now(tz_sp)
-        start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        
-        transactions = await prisma.transactions.find_many(
-            where={
-                "user_id": user_id,
-                "date": {
-                    "gte": start_of_month
-                }
-            },
-            order={"date": "desc"}
-        )
-        
-        # Calcular totais do mês
-        monthly_income = sum(float(t.amount) for t in transactions if float(t.amount) > 0)
-        monthly_expenses = abs(sum(float(t.amount) for t in transactions if float(t.amount) < 0))
-        
-        # Buscar saldo total
-        all_transactions = await prisma.transactions.find_many(
-            where={"user_id": user_id}
-        )
-        balance = sum(float(t.amount) for t in all_transactions)
-        
-        # Analisar categorias com mais gastos
-        expense_categories = {}
-        for t in transactions:
-            if float(t.amount) < 0:
-                category = t.category
-                amount = abs(float(t.amount))
-                expense_categories[category] = expense_categories.get(category, 0) + amount
-        
-        # Ordenar categorias por valor gasto
-        top_categories = sorted(
-            expense_categories.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:3]
-        
-        # Formatar top categorias
-        top_expense_categories = "\n".join(
-            f"• {cat}: R$ {val:.2f}"
-            for cat, val in top_categories
-        )
-        
-        # Analisar tendências
-        trends = []
-        if monthly_expenses > monthly_income:
-            trends.append("Seus gastos estão maiores que suas receitas este mês")
-        if monthly_expenses > 0 and monthly_expenses / monthly_income > 0.8:
-            trends.append("Você está gastando mais de 80% da sua renda")
-        if balance < 0:
-            trends.append("Seu saldo está negativo")
-        if not transactions:
-            trends.append("Nenhuma transação registrada este mês")
-        
-        return {
-            "balance": f"R$ {abs(float(balance)):.2f}",
-            "monthlyIncome": f"R$ {monthly_income:.2f}",
-            "monthlyExpenses": f"R$ {monthly_expenses:.2f}",
-            "topExpenseCategories": top_expense_categories,
-            "trends": "\n".join(f"• {t}" for t in trends)
-        }
+        # Consulta única aos consolidados, em cache até a próxima transação do usuário
+        return await build_financial_context(prisma, user_id)
         
     except Exception as e:
-        print(f"Erro ao buscar contexto financeiro: {str(e)}")
+        logger.exception("Erro ao buscar contexto financeiro")
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao buscar contexto financeiro: {str(e)}"
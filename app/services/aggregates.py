@@ -0,0 +1,118 @@
+"""
+    Esse código concentra as agregações de transações feitas no banco
+(GROUP BY via query_raw), para que os relatórios recebam apenas totais e
+contagens em vez das linhas completas. Períodos que cobrem meses inteiros
+são lidos dos consolidados mensais (transaction_rollups).
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from prisma import Prisma
+from .ledger import get_rollups
+
+TOTALS_BY_TYPE_SQL = """
+SELECT "type", SUM(ABS("amount")) AS total, COUNT(*) AS count
+FROM "transactions"
+WHERE "user_id" = $1 AND "date" >= $2::timestamptz AND "date" {upper_op} $3::timestamptz
+GROUP BY "type"
+"""
+
+TOTALS_BY_CATEGORY_SQL = """
+SELECT "category", "type", SUM(ABS("amount")) AS total, COUNT(*) AS count
+FROM "transactions"
+WHERE "user_id" = $1 AND "date" >= $2::timestamptz AND "date" {upper_op} $3::timestamptz
+GROUP BY "category", "type"
+ORDER BY total DESC
+"""
+
+
+def _upper_op(inclusive_end: bool) -> str:
+    return "<=" if inclusive_end else "<"
+
+
+def _empty_totals() -> Dict[str, Dict[str, Any]]:
+    return {
+        "INCOME": {"total": Decimal("0"), "count": 0},
+        "EXPENSE": {"total": Decimal("0"), "count": 0}
+    }
+
+
+async def totals_by_type(
+    db: Prisma,
+    user_id: str,
+    start: datetime,
+    end: datetime,
+    inclusive_end: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Retorna o total (em módulo) e a quantidade de transações por tipo.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: {"INCOME": {"total", "count"}, "EXPENSE": {...}}
+    """
+    rows = await db.query_raw(
+        TOTALS_BY_TYPE_SQL.format(upper_op=_upper_op(inclusive_end)),
+        user_id,
+        start,
+        end
+    )
+    totals = _empty_totals()
+    for row in rows:
+        totals[row["type"]] = {
+            "total": Decimal(str(row["total"] or 0)),
+            "count": int(row["count"])
+        }
+    return totals
+
+
+async def totals_by_category(
+    db: Prisma,
+    user_id: str,
+    start: datetime,
+    end: datetime,
+    inclusive_end: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Retorna o total (em módulo) e a quantidade de transações por categoria e
+    tipo, ordenados do maior para o menor total.
+    """
+    rows = await db.query_raw(
+        TOTALS_BY_CATEGORY_SQL.format(upper_op=_upper_op(inclusive_end)),
+        user_id,
+        start,
+        end
+    )
+    return [
+        {
+            "category": row["category"],
+            "type": row["type"],
+            "total": Decimal(str(row["total"] or 0)),
+            "count": int(row["count"])
+        }
+        for row in rows
+    ]
+
+
+async def rollup_totals_by_category(
+    db: Prisma,
+    user_id: str,
+    start_month: datetime,
+    end_month: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    """
+    Mesmo formato de totals_by_category, somando os consolidados mensais
+    de [start_month, end_month).
+    """
+    grouped: Dict[tuple, Dict[str, Any]] = {}
+    for rollup in await get_rollups(db, user_id, start_month, end_month):
+        key = (rollup.category, rollup.type)
+        if key not in grouped:
+            grouped[key] = {
+                "category": rollup.category,
+                "type": rollup.type,
+                "total": Decimal("0"),
+                "count": 0
+            }
+        grouped[key]["total"] += Decimal(str(rollup.total))
+        grouped[key]["count"] += rollup.count
+    return sorted(grouped.values(), key=lambda row: row["total"], reverse=True)
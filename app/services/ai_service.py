@@ -1,30 +1,79 @@
-from anthropic import Anthropic
+"""
+    Esse código gera os conselhos financeiros com o Claude. As chamadas usam
+o cliente assíncrono, com limite de chamadas simultâneas e timeout por
+chamada, e a resposta fica em cache pelo contexto financeiro normalizado e
+pelo modo (conselhos, dicas ou análise): pedidos repetidos sem mudança nas
+finanças não chamam o modelo de novo.
+"""
+import asyncio
+import hashlib
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+from anthropic import APITimeoutError, AsyncAnthropic
 from fastapi import HTTPException
-import os
+from ..core.config import settings
+from .cache import TTLCache
+from .utils import get_bulkhead, run_with_timeout
 
-class FinancialAdvisorService:
-    def __init__(self):
-        self.client = Anthropic(api_key=os.getenv("CLAUDE_API_KEY"))
-        self.system_prompt = """Você é um consultor financeiro especializado em análise de gastos pessoais.
+ADVICE = "advice"
+TIPS = "tips"
+ANALYSIS = "analysis"
+
+# Campos do contexto financeiro usados no prompt, com o valor padrão
+CONTEXT_FIELDS = {
+    "balance": "R$ 0,00",
+    "monthlyIncome": "R$ 0,00",
+    "monthlyExpenses": "R$ 0,00",
+    "topExpenseCategories": "Nenhum gasto registrado",
+    "trends": "Nenhuma tendência identificada",
+}
+
+SYSTEM_PROMPT = """Você é um consultor financeiro especializado em análise de gastos pessoais.
         Suas respostas devem ser profissionais, claras, amigáveis e em português. Use um tom interativo e acolhedor para engajar o usuário."""
 
-    async def analisar_transacoes(self, context: dict):
-        try:
-            is_advice = context.get("message", "").lower().includes("conselhos")
-            is_tips = context.get("message", "").lower().includes("dicas")
-            financial_context = context.get("financialContext", {})
-            
-            prompt = f"""Analise o cenário financeiro do usuário e forneça uma análise personalizada.
+
+def advice_mode(message: Optional[str]) -> str:
+    """Identifica o modo pelo texto da mensagem ("conselhos", "dicas" ou análise geral)"""
+    text = (message or "").lower()
+    if "conselhos" in text:
+        return ADVICE
+    if "dicas" in text:
+        return TIPS
+    return ANALYSIS
+
+
+def _normalize_text(value: Any) -> str:
+    return "\n".join(" ".join(line.split()) for line in str(value).strip().splitlines())
+
+
+def normalize_context(financial_context: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Mantém só os campos usados no prompt, com espaços normalizados"""
+    financial_context = financial_context or {}
+    return {
+        field: _normalize_text(financial_context.get(field) or default)
+        for field, default in CONTEXT_FIELDS.items()
+    }
+
+
+def cache_key(financial_context: Dict[str, str], mode: str) -> str:
+    payload = json.dumps(financial_context, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(f"{mode}:{payload}".encode("utf-8")).hexdigest()
+
+
+def build_prompt(financial_context: Dict[str, str], mode: str) -> str:
+    is_advice = mode == ADVICE
+    is_tips = mode == TIPS
+    return f"""Analise o cenário financeiro do usuário e forneça uma análise personalizada.
 
 Contexto Financeiro:
-- Saldo atual: {financial_context.get("balance", "R$ 0,00")}
-- Receitas do mês: {financial_context.get("monthlyIncome", "R$ 0,00")}
-- Despesas do mês: {financial_context.get("monthlyExpenses", "R$ 0,00")}
-- Categorias com mais gastos: {financial_context.get("topExpenseCategories", "Nenhum gasto registrado")}
-- Tendências: {financial_context.get("trends", "Nenhuma tendência identificada")}
-
-{'Gere uma análise financeira estratégica seguindo EXATAMENTE este formato:' if is_advice else 
-'Gere dicas práticas de economia seguindo EXATAMENTE este formato:' if is_tips else 
+- Saldo atual: {financial_context["balance"]}
+- Receitas do mês: {financial_context["monthlyIncome"]}
+- Despesas do mês: {financial_context["monthlyExpenses"]}
+- Categorias com mais gastos: {financial_context["topExpenseCategories"]}
+- Tendências: {financial_context["trends"]}
+
+{'Gere uma análise financeira estratégica seguindo EXATAMENTE este formato:' if is_advice else
+'Gere dicas práticas de economia seguindo EXATAMENTE este formato:' if is_tips else
 'Gere uma análise financeira personalizada seguindo EXATAMENTE este formato:'}
 
 💡 *{'Análise Financeira Estratégica' if is_advice else 'Dicas Práticas de Economia' if is_tips else 'Análise Financeira Personalizada'}*
@@ -44,7 +93,7 @@ Contexto Financeiro:
 • {'Liste 2-3 ações concretas para implementar agora' if is_advice else 'Liste 2-3 hábitos simples para implementar' if is_tips else 'Liste 2-3 ações concretas para implementar'}
 • {'Mantenha o tom motivador e profissional' if is_advice else 'Mantenha o tom leve e motivador' if is_tips else 'Mantenha o tom motivador e profissional'}
 
-IMPORTANTE: 
+IMPORTANTE:
 1. Siga exatamente este formato, incluindo os emojis e a formatação markdown
 2. Não inclua títulos adicionais
 3. Não use listas com bullets (•) no texto
@@ -53,17 +102,106 @@ IMPORTANTE:
 6. {'Mantenha o tom profissional e estratégico' if is_advice else 'Mantenha o tom leve e motivador' if is_tips else 'Mantenha o tom profissional e motivador'}
 7. Não adicione linhas em branco extras entre os parágrafos"""
 
+
+class FinancialAdvisorService:
+    def __init__(self, client: Optional[AsyncAnthropic] = None):
+        self.client = client or AsyncAnthropic(
+            api_key=settings.claude_api_key,
+            base_url=settings.claude_base_url or None,
+            timeout=settings.advice_timeout,
+            max_retries=settings.advice_max_retries
+        )
+        self.system_prompt = SYSTEM_PROMPT
+        self._bulkhead = get_bulkhead("advice", settings.advice_concurrency)
+        self._cache = TTLCache(maxsize=settings.advice_cache_size, ttl=settings.advice_cache_ttl)
+
+    def request_params(self, financial_context: Dict[str, str], mode: str) -> Dict[str, Any]:
+        """Parâmetros da chamada ao modelo (também usados no streaming)"""
+        return {
+            "model": settings.claude_model,
+            "max_tokens": settings.advice_max_tokens,
+            "system": self.system_prompt,
+            "messages": [{
+                "role": "user",
+                "content": build_prompt(financial_context, mode)
+            }]
+        }
+
+    async def _generate(self, financial_context: Dict[str, str], mode: str) -> str:
+        # Limita as chamadas simultâneas ao modelo; o timeout vale para a
+        # chamada inteira, incluindo a espera na fila
+        async def call() -> str:
             mensagem = await self.client.messages.create(
-                model="claude-3-opus-20240229",
-                max_tokens=1000,
-                messages=[{
-                    "role": "system",
-                    "content": self.system_prompt
-                }, {
-                    "role": "user",
-                    "content": prompt
-                }]
+                **self.request_params(financial_context, mode)
+            )
+            return "".join(block.text for block in mensagem.content if block.type == "text")
+
+        return await run_with_timeout(call, timeout=settings.advice_timeout, bulkhead=self._bulkhead)
+
+    async def analisar_transacoes(self, context: dict) -> str:
+        """
+        Gera (ou devolve do cache) a análise para o contexto financeiro.
+
+        Args:
+            context (dict): message (texto do usuário, define o modo) ou mode,
+                e financialContext
+        """
+        try:
+            mode = context.get("mode") or advice_mode(context.get("message"))
+            financial_context = normalize_context(context.get("financialContext"))
+            return await self._cache.get_or_load(
+                cache_key(financial_context, mode),
+                lambda: self._generate(financial_context, mode)
             )
-            return mensagem.content[0].text
+        except (asyncio.TimeoutError, APITimeoutError):
+            # O prazo do cliente HTTP e o da chamada são o mesmo (ADVICE_TIMEOUT):
+            # qualquer um dos dois pode estourar primeiro
+            raise HTTPException(status_code=504, detail="Tempo esgotado ao gerar a análise financeira")
         except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def stream_analysis(self, context: dict) -> AsyncIterator[str]:
+        """
+        Gera a análise em partes, à medida que o modelo produz o texto.
+
+        Se a análise já estiver em cache, ela é enviada de uma vez. O texto
+        completo é guardado no cache ao final. O prazo ADVICE_TIMEOUT vale
+        para a geração inteira (fila + streaming).
+        """
+        mode = context.get("mode") or advice_mode(context.get("message"))
+        financial_context = normalize_context(context.get("financialContext"))
+        key = cache_key(financial_context, mode)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.advice_timeout
+        await self._bulkhead.acquire(settings.advice_timeout)
+        try:
+            chunks = []
+            async with self.client.messages.stream(**self.request_params(financial_context, mode)) as stream:
+                tokens = stream.text_stream.__aiter__()
+                while True:
+                    try:
+                        text = await asyncio.wait_for(tokens.__anext__(), deadline - loop.time())
+                    except StopAsyncIteration:
+                        break
+                    chunks.append(text)
+                    yield text
+            self._cache.set(key, "".join(chunks))
+        finally:
+            self._bulkhead.release()
+
+
+_advisor: Optional[FinancialAdvisorService] = None
+
+
+def get_advisor() -> FinancialAdvisorService:
+    """Instância compartilhada (o cache e o limite de concorrência são por processo)"""
+    global _advisor
+    if _advisor is None:
+        _advisor = FinancialAdvisorService()
+    return _advisor
@@ -0,0 +1,100 @@
+"""
+    Esse código implementa um cache em memória com expiração (TTL) e limite
+de itens (LRU), usado para estados curtos por usuário/telefone e para
+evitar consultas repetidas ao banco.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._loading: Dict[Hashable, "asyncio.Future"] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retorna o valor se existir e não tiver expirado"""
+        item = self._data.get(key)
+        if item is None:
+            return default
+        value, expires_at = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Grava o valor, descartando o item menos usado quando cheio"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Retorna o valor do cache ou carrega com `loader`.
+
+        Chamadas simultâneas para a mesma chave aguardam um único carregamento
+        (single-flight). Valores None não são guardados.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        pending = self._loading.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Evita aviso de exceção não recuperada quando ninguém mais aguarda
+            future.exception()
+            raise
+        else:
+            if value is not None:
+                self.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        finally:
+            self._loading.pop(key, None)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.pop(key, None)
+        return default if item is None else item[0]
+
+    def remove_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Remove os itens para os quais predicate(chave, valor) for verdadeiro"""
+        keys = [key for key, (value, _) in self._data.items() if predicate(key, value)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_MISSING = object()
@@ -0,0 +1,61 @@
+"""
+    Esse código resolve (usuário, nome, tipo) → id da categoria com cache em
+memória (LRU + TTL). Cada chave é carregada uma única vez mesmo com
+mensagens simultâneas, e a criação usa upsert na chave única da tabela.
+"""
+import uuid
+from typing import Any
+from prisma import Prisma
+from prisma.errors import UniqueViolationError
+from ..core.config import settings
+from .cache import TTLCache
+
+_category_ids = TTLCache(
+    maxsize=settings.category_cache_size,
+    ttl=settings.category_cache_ttl
+)
+
+
+def _type_value(type: Any) -> str:
+    return str(getattr(type, "value", type))
+
+
+async def _upsert_category(db: Prisma, user_id: str, name: str, type: str) -> str:
+    where = {
+        "user_id_name_type": {
+            "user_id": user_id,
+            "name": name,
+            "type": type
+        }
+    }
+    try:
+        category = await db.categories.upsert(
+            where=where,
+            data={
+                "create": {
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "name": name,
+                    "type": type
+                },
+                "update": {}
+            }
+        )
+    except UniqueViolationError:
+        # Outra instância criou a mesma categoria ao mesmo tempo
+        category = await db.categories.find_unique(where=where)
+    return category.id
+
+
+async def resolve_category_id(db: Prisma, user_id: str, name: str, type: Any) -> str:
+    """Retorna o id da categoria, criando-a se ainda não existir"""
+    type = _type_value(type)
+    return await _category_ids.get_or_load(
+        (user_id, name, type),
+        lambda: _upsert_category(db, user_id, name, type)
+    )
+
+
+def invalidate_category(user_id: str, name: str, type: Any) -> None:
+    """Remove a categoria do cache (chamar quando a categoria for criada ou alterada)"""
+    _category_ids.pop((user_id, name, _type_value(type)))
@@ -0,0 +1,95 @@
+"""
+    Esse código monta o contexto financeiro usado pelos conselhos da IA
+(saldo, receitas/despesas do mês e principais categorias de gasto) com uma
+única consulta aos consolidados, mantendo o resultado em cache até a
+próxima escrita de transação do usuário.
+"""
+import heapq
+from typing import Any, Dict
+from prisma import Prisma
+from ..core.config import settings
+from ..utils.formatting import format_brl
+from ..utils.periods import period_range, rollup_months
+from ..db.models import PeriodType
+from .cache import TTLCache
+from .ledger import on_transaction_write
+
+# Saldo consolidado + totais do mês por categoria em uma única ida ao banco
+FINANCIAL_CONTEXT_SQL = """
+SELECT b."balance", r."category", r."type", r."total"
+FROM (SELECT $1::text AS "user_id") u
+LEFT JOIN "user_balances" b ON b."user_id" = u."user_id"
+LEFT JOIN "transaction_rollups" r
+    ON r."user_id" = u."user_id" AND r."month" = $2::date AND r."count" > 0
+"""
+
+_cache = TTLCache(maxsize=10000, ttl=settings.financial_context_cache_ttl)
+
+
+@on_transaction_write
+def invalidate_financial_context(user_id: str) -> None:
+    _cache.pop(user_id)
+
+
+async def build_financial_context(db: Prisma, user_id: str) -> Dict[str, Any]:
+    """
+    Retorna o contexto financeiro do usuário, do cache quando possível.
+
+    Returns:
+        Dict[str, Any]: balance, monthlyIncome, monthlyExpenses,
+        topExpenseCategories e trends, já formatados
+    """
+    cached = _cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    month, _ = rollup_months(period_range(PeriodType.MONTHLY))
+    rows = await db.query_raw(
+        FINANCIAL_CONTEXT_SQL,
+        user_id,
+        month.date().isoformat()
+    )
+
+    # Uma única passada: saldo, totais do mês e gastos por categoria
+    balance = 0.0
+    monthly_income = 0.0
+    monthly_expenses = 0.0
+    expense_categories = []
+    for row in rows:
+        if row["balance"] is not None:
+            balance = float(row["balance"])
+        if row["type"] is None:
+            continue
+        total = float(row["total"])
+        if row["type"] == "INCOME":
+            monthly_income += total
+        elif row["type"] == "EXPENSE":
+            monthly_expenses += total
+            expense_categories.append((total, row["category"]))
+
+    top_categories = heapq.nlargest(3, expense_categories)
+    top_expense_categories = "\n".join(
+        f"• {cat}: {format_brl(val, True)}"
+        for val, cat in top_categories
+    )
+
+    # Analisar tendências
+    trends = []
+    if monthly_expenses > monthly_income:
+        trends.append("Seus gastos estão maiores que suas receitas este mês")
+    if monthly_income > 0 and monthly_expenses / monthly_income > 0.8:
+        trends.append("Você está gastando mais de 80% da sua renda")
+    if balance < 0:
+        trends.append("Seu saldo está negativo")
+    if monthly_income == 0 and monthly_expenses == 0:
+        trends.append("Nenhuma transação registrada este mês")
+
+    context = {
+        "balance": format_brl(abs(balance), True),
+        "monthlyIncome": format_brl(monthly_income, True),
+        "monthlyExpenses": format_brl(monthly_expenses, True),
+        "topExpenseCategories": top_expense_categories,
+        "trends": "\n".join(f"• {t}" for t in trends)
+    }
+    _cache.set(user_id, context)
+    return context
@@ -0,0 +1,98 @@
+"""
+    Esse código implementa as verificações de saúde usadas pelo balanceador
+(/health/live e /health/ready): latência do banco, estado da conexão e
+limites do pool, alcance do serviço do WhatsApp e atraso do event loop. O resultado de cada
+verificação externa fica em cache por alguns segundos, então as sondas do
+balanceador não geram carga extra no banco nem no serviço do WhatsApp.
+
+O uso atual do pool (conexões ocupadas/livres) não é informado: o
+cliente Prisma só o expõe com o preview feature "metrics" no schema.
+"""
+import asyncio
+import time
+from typing import Any, Dict
+import httpx
+from prisma import Prisma
+from ..core.config import settings
+from ..db.prisma import ensure_connection, pool_settings
+from .cache import TTLCache
+
+_probes = TTLCache(maxsize=16, ttl=settings.health_cache_ttl)
+
+# Intervalo do timer usado para medir o atraso do event loop
+LOOP_LAG_INTERVAL = 0.005
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+async def loop_lag_ms() -> float:
+    """
+    Atraso do event loop: quanto um timer curto dispara depois do horário
+    agendado (com o loop ocupado por código bloqueante, o atraso cresce)
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await asyncio.sleep(LOOP_LAG_INTERVAL)
+    return round(max(0.0, loop.time() - start - LOOP_LAG_INTERVAL) * 1000, 2)
+
+
+async def _probe_database(db: Prisma) -> Dict[str, Any]:
+    if not db.is_connected():
+        # Tenta reconectar (ex.: banco indisponível na inicialização); o
+        # connect já respeita DB_CONNECT_TIMEOUT
+        try:
+            await ensure_connection()
+        except Exception as e:
+            return {"status": "down", "connected": False, "error": str(e) or type(e).__name__}
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(db.query_raw("SELECT 1"), settings.health_probe_timeout)
+    except Exception as e:
+        return {
+            "status": "down",
+            "connected": True,
+            "latency_ms": _elapsed_ms(start),
+            "error": str(e) or type(e).__name__
+        }
+    return {"status": "up", "connected": True, "latency_ms": _elapsed_ms(start)}
+
+
+async def _probe_whatsapp(client: httpx.AsyncClient) -> Dict[str, Any]:
+    # Qualquer resposta HTTP indica que o serviço está alcançável
+    start = time.perf_counter()
+    try:
+        response = await client.get("/", timeout=settings.health_probe_timeout)
+    except Exception as e:
+        return {"status": "down", "latency_ms": _elapsed_ms(start), "error": str(e) or type(e).__name__}
+    return {"status": "up", "latency_ms": _elapsed_ms(start), "http_status": response.status_code}
+
+
+async def check_database(db: Prisma) -> Dict[str, Any]:
+    """Estado e latência do banco (em cache por HEALTH_CACHE_TTL segundos)"""
+    return await _probes.get_or_load("database", lambda: _probe_database(db))
+
+
+async def check_whatsapp(client: httpx.AsyncClient) -> Dict[str, Any]:
+    """Alcance e latência do serviço do WhatsApp (em cache por HEALTH_CACHE_TTL segundos)"""
+    return await _probes.get_or_load("whatsapp", lambda: _probe_whatsapp(client))
+
+
+async def readiness(db: Prisma, whatsapp_client: httpx.AsyncClient) -> Dict[str, Any]:
+    """
+    Pronto para receber tráfego quando o banco responde. O WhatsApp é
+    informado, mas não tira a instância do balanceador (a API continua
+    atendendo as rotas REST).
+    """
+    database, whatsapp = await asyncio.gather(
+        check_database(db),
+        check_whatsapp(whatsapp_client)
+    )
+    return {
+        "status": "ready" if database["status"] == "up" else "not_ready",
+        # Estado da conexão agora (a sonda pode estar em cache) e limites do pool
+        "database": {**database, "connected": db.is_connected(), "pool": pool_settings()},
+        "whatsapp": whatsapp,
+        "event_loop_lag_ms": await loop_lag_ms()
+    }
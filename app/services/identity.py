@@ -0,0 +1,68 @@
+"""
+    Esse código mantém o cache de identidade telefone → usuário (id, nome,
+e-mail), compartilhado pelo webhook e pelas rotas /users usadas pelo bot.
+Números desconhecidos também ficam em cache por um período curto, para
+que mensagens de não cadastrados não consultem o banco a cada vez.
+"""
+from typing import Any, Optional
+from prisma import Prisma
+from ..core.config import settings
+from ..db.models import UserResponse
+from .cache import TTLCache
+
+_NOT_FOUND = object()
+
+_users = TTLCache(maxsize=settings.identity_cache_size, ttl=settings.identity_cache_ttl)
+_profiles = TTLCache(maxsize=settings.identity_cache_size, ttl=settings.identity_cache_ttl)
+
+
+def normalize_phone(phone: str) -> str:
+    """Formata o número do telefone (remove o sufixo @c.us e o +)"""
+    return phone.replace("@c.us", "").replace("+", "")
+
+
+async def _load(cache: TTLCache, phone: str, loader) -> Any:
+    async def load():
+        value = await loader()
+        if value is None:
+            cache.set(phone, _NOT_FOUND, ttl=settings.identity_negative_ttl)
+        return value
+
+    value = await cache.get_or_load(phone, load)
+    return None if value is _NOT_FOUND else value
+
+
+async def find_user_by_phone(db: Prisma, phone: str) -> Optional[UserResponse]:
+    """Retorna id, nome, e-mail e telefone do usuário do número (None se não houver)"""
+    phone = normalize_phone(phone)
+
+    async def load():
+        user = await db.users.find_unique(where={"phone": phone})
+        if not user:
+            return None
+        return UserResponse(id=user.id, email=user.email, name=user.name, phone=user.phone)
+
+    return await _load(_users, phone, load)
+
+
+async def find_profile_by_phone(db: Prisma, phone: str) -> Optional[Any]:
+    """Retorna o perfil associado ao número (None se não houver)"""
+    phone = normalize_phone(phone)
+    return await _load(
+        _profiles,
+        phone,
+        lambda: db.profiles.find_first(where={"phone": phone})
+    )
+
+
+def invalidate_phone(phone: str) -> None:
+    """Remove o número do cache (ex.: após cadastro ou criação de perfil)"""
+    phone = normalize_phone(phone)
+    _users.pop(phone)
+    _profiles.pop(phone)
+
+
+def invalidate_user(user_id: str) -> None:
+    """Remove do cache os números associados ao usuário (ex.: após edição ou exclusão)"""
+    _users.remove_where(lambda phone, user: user is not _NOT_FOUND and user.id == user_id)
+    _profiles.remove_where(lambda phone, profile: profile is not _NOT_FOUND and profile.id == user_id)
@@ -0,0 +1,308 @@
+"""
+    Esse código importa transações em lote a partir de extratos bancários
+(CSV ou OFX). Os arquivos são lidos linha a linha, as categorias são
+resolvidas uma vez por nome e as inserções são feitas com create_many em
+blocos, emitindo eventos de progresso em NDJSON.
+"""
+import csv
+import json
+import logging
+import os
+import re
+import uuid
+from itertools import islice
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, TextIO, Tuple
+from prisma import Prisma
+from starlette.concurrency import run_in_threadpool
+from .ledger import apply_transactions, notify_write
+from .categories import resolve_category_id
+from ..utils.periods import get_timezone
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FORMATS = ("csv", "ofx")
+
+# Limite da coluna transactions.amount (Decimal(10, 2))
+MAX_AMOUNT = Decimal("99999999.99")
+
+# Nomes de coluna aceitos no CSV
+CSV_COLUMNS = {
+    "date": ("date", "data"),
+    "amount": ("amount", "valor"),
+    "description": ("description", "descricao", "descrição", "historico", "histórico"),
+    "category": ("category", "categoria"),
+    "type": ("type", "tipo"),
+}
+
+TYPE_ALIASES = {
+    "INCOME": "INCOME",
+    "RECEITA": "INCOME",
+    "CREDIT": "INCOME",
+    "CREDITO": "INCOME",
+    "CRÉDITO": "INCOME",
+    "EXPENSE": "EXPENSE",
+    "DESPESA": "EXPENSE",
+    "DEBIT": "EXPENSE",
+    "DEBITO": "EXPENSE",
+    "DÉBITO": "EXPENSE",
+}
+
+OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+ParsedRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def detect_format(filename: Optional[str], declared: Optional[str] = None) -> str:
+    """Identifica o formato pelo parâmetro informado ou pela extensão do arquivo"""
+    file_format = (declared or os.path.splitext(filename or "")[1].lstrip(".")).lower()
+    if file_format not in SUPPORTED_FORMATS:
+        raise ValueError(f"Formato não suportado. Valores aceitos: {', '.join(SUPPORTED_FORMATS)}")
+    return file_format
+
+
+def parse_amount(value: str) -> Decimal:
+    """Converte valores como '1.234,56', '-50,00', '1234.56' ou 'R$ 10' em Decimal"""
+    text = value.replace("R$", "").replace(" ", "").strip()
+    if "," in text and "." in text:
+        if text.rfind(",") > text.rfind("."):
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+    elif "," in text:
+        text = text.replace(",", ".")
+    elif text.count(".") > 1:
+        text = text.replace(".", "")
+    try:
+        amount = Decimal(text).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ValueError(f"Valor inválido: '{value}'")
+    if abs(amount) > MAX_AMOUNT:
+        raise ValueError(f"Valor fora do limite: '{value}'")
+    return amount
+
+
+def parse_date(value: str) -> datetime:
+    """Aceita AAAA-MM-DD, DD/MM/AAAA, ISO com horário e o formato do OFX (AAAAMMDD...)"""
+    text = value.strip()
+    for pattern, length in (("%Y-%m-%d", 10), ("%d/%m/%Y", 10), ("%d/%m/%y", 8), ("%Y%m%d", 8)):
+        try:
+            return datetime.strptime(text[:length], pattern).replace(tzinfo=get_timezone())
+        except ValueError:
+            continue
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        return parsed.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=parsed.tzinfo or get_timezone())
+    except ValueError:
+        raise ValueError(f"Data inválida: '{value}'")
+
+
+def _build_row(
+    date_value: str,
+    amount_value: str,
+    description: Optional[str],
+    category: Optional[str],
+    type_value: Optional[str],
+    default_category: str
+) -> Dict[str, Any]:
+    amount = parse_amount(amount_value or "")
+    if type_value:
+        transaction_type = TYPE_ALIASES.get(type_value.strip().upper())
+        if not transaction_type:
+            raise ValueError(f"Tipo inválido: '{type_value}'")
+    else:
+        transaction_type = "EXPENSE" if amount < 0 else "INCOME"
+    return {
+        "date": parse_date(date_value or ""),
+        "amount": abs(amount),
+        "description": (description or "").strip() or None,
+        "category": (category or "").strip() or default_category,
+        "type": transaction_type,
+    }
+
+
+def iter_csv(handle: TextIO, default_category: str) -> Iterator[ParsedRow]:
+    """Lê o CSV linha a linha (separador ',' ou ';', cabeçalho obrigatório)"""
+    header_line = handle.readline()
+    delimiter = ";" if header_line.count(";") > header_line.count(",") else ","
+    header = [column.strip().lower() for column in next(csv.reader([header_line], delimiter=delimiter), [])]
+
+    positions = {}
+    for field, aliases in CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in header:
+                positions[field] = header.index(alias)
+                break
+    missing = [field for field in ("date", "amount") if field not in positions]
+    if missing:
+        raise ValueError(f"Colunas obrigatórias ausentes no CSV: {', '.join(missing)}")
+
+    def column(values: List[str], field: str) -> Optional[str]:
+        position = positions.get(field)
+        if position is None or position >= len(values):
+            return None
+        return values[position]
+
+    for row_number, values in enumerate(csv.reader(handle, delimiter=delimiter), start=2):
+        if not any(value.strip() for value in values):
+            continue
+        try:
+            yield row_number, _build_row(
+                column(values, "date"),
+                column(values, "amount"),
+                column(values, "description"),
+                column(values, "category"),
+                column(values, "type"),
+                default_category
+            ), None
+        except ValueError as e:
+            yield row_number, None, str(e)
+
+
+def iter_ofx(handle: TextIO, default_category: str) -> Iterator[ParsedRow]:
+    """Lê os blocos <STMTTRN> do OFX (SGML ou XML) linha a linha"""
+    current: Optional[Dict[str, str]] = None
+    row_number = 0
+    for line in handle:
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if not closing:
+                    current = {}
+                    continue
+                if current is not None:
+                    row_number += 1
+                    try:
+                        yield row_number, _build_row(
+                            current.get("DTPOSTED", ""),
+                            current.get("TRNAMT", ""),
+                            current.get("MEMO") or current.get("NAME"),
+                            None,
+                            None,
+                            default_category
+                        ), None
+                    except ValueError as e:
+                        yield row_number, None, f"{e} (FITID {current.get('FITID', '-')})"
+                current = None
+            elif current is not None and not closing:
+                current[tag] = value.strip()
+
+
+async def _resolve_categories(
+    db: Prisma,
+    user_id: str,
+    rows: List[Dict[str, Any]],
+    categories: Dict[Tuple[str, str], str]
+) -> None:
+    """Resolve (uma vez por nome e tipo) as categorias ainda desconhecidas"""
+    for name, transaction_type in {(row["category"], row["type"]) for row in rows}:
+        if (name, transaction_type) not in categories:
+            categories[(name, transaction_type)] = await resolve_category_id(
+                db, user_id, name, transaction_type
+            )
+
+
+async def _insert_chunk(
+    db: Prisma,
+    user_id: str,
+    rows: List[Dict[str, Any]],
+    categories: Dict[Tuple[str, str], str]
+) -> int:
+    await _resolve_categories(db, user_id, rows, categories)
+    now = datetime.utcnow()
+    data = [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "amount": str(row["amount"]),
+            "description": row["description"],
+            "category": row["category"],
+            "type": row["type"],
+            "date": row["date"],
+            "categoryId": categories[(row["category"], row["type"])],
+            "created_at": now,
+            "updated_at": now
+        }
+        for row in rows
+    ]
+    async with db.tx() as tx:
+        inserted = await tx.transactions.create_many(data=data)
+        await apply_transactions(tx, user_id, [item["id"] for item in data])
+    notify_write(user_id)
+    return inserted
+
+
+def _read_rows(rows: Iterator[ParsedRow], size: int) -> List[ParsedRow]:
+    """Próximas `size` linhas do parser (roda numa thread: lê o arquivo)"""
+    return list(islice(rows, size))
+
+
+def remove_file(path: str) -> None:
+    """Remove o arquivo temporário da importação (se ainda existir)"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _event(**payload: Any) -> str:
+    return json.dumps(payload, ensure_ascii=False) + "\n"
+
+
+async def import_transactions(
+    db: Prisma,
+    user_id: str,
+    path: str,
+    file_format: str,
+    default_category: str = "Importado",
+    chunk_size: int = 1000,
+    encoding: str = "utf-8-sig"
+) -> AsyncIterator[str]:
+    """
+    Importa o arquivo salvo em `path` e emite eventos NDJSON:
+
+    - {"event": "error", "row": n, "error": "..."} para cada linha inválida
+    - {"event": "progress", "processed": n, "inserted": n, "errors": n} a cada bloco
+    - {"event": "done", ...} ao final (ou {"event": "failed", ...} se abortar)
+
+    A leitura e o parse do arquivo rodam no threadpool, um bloco por vez, para
+    não bloquear o event loop. O arquivo pertence a quem chama, que deve
+    removê-lo (remove_file) mesmo se o gerador nunca for iterado.
+    """
+    processed = inserted = errors = 0
+    try:
+        categories = {
+            (category.name, category.type): category.id
+            for category in await db.categories.find_many(where={"user_id": user_id})
+        }
+        parser = iter_csv if file_format == "csv" else iter_ofx
+        chunk: List[Dict[str, Any]] = []
+
+        handle = await run_in_threadpool(open, path, encoding=encoding, errors="replace", newline="")
+        try:
+            rows = parser(handle, default_category)
+            while True:
+                batch = await run_in_threadpool(_read_rows, rows, chunk_size)
+                if not batch:
+                    break
+                for row_number, row, error in batch:
+                    processed += 1
+                    if error:
+                        errors += 1
+                        yield _event(event="error", row=row_number, error=error)
+                        continue
+                    chunk.append(row)
+                    if len(chunk) >= chunk_size:
+                        inserted += await _insert_chunk(db, user_id, chunk, categories)
+                        chunk = []
+                        yield _event(event="progress", processed=processed, inserted=inserted, errors=errors)
+        finally:
+            handle.close()
+
+        if chunk:
+            inserted += await _insert_chunk(db, user_id, chunk, categories)
+        yield _event(event="done", processed=processed, inserted=inserted, errors=errors)
+    except Exception as e:
+        logger.exception("Erro na importação (usuário %s)", user_id)
+        yield _event(event="failed", processed=processed, inserted=inserted, errors=errors, error=str(e))
@@ -0,0 +1,244 @@
+"""
+    Esse código mantém os consolidados de cada usuário, atualizados a cada
+escrita de transação para que saldo e relatórios não precisem varrer todo
+o histórico:
+
+- user_balances: totais de receitas/despesas, saldo e quantidade
+- transaction_rollups: totais por (usuário, mês, categoria, tipo), com o
+  mês calculado no fuso DEFAULT_TIMEZONE (o mesmo de get_timezone),
+  passado como parâmetro para o SQL
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, List, Optional, Tuple
+from prisma import Prisma
+from ..core.config import settings
+
+# Funções chamadas com o user_id a cada escrita de transação (invalidação de caches)
+_write_listeners: List[Callable[[str], None]] = []
+
+# Aplica um delta de forma atômica (INSERT ... ON CONFLICT soma ao valor atual)
+APPLY_DELTA_SQL = """
+INSERT INTO "user_balances" ("user_id", "income_total", "expense_total", "balance", "row_count", "updated_at")
+VALUES ($1, $2::numeric, $3::numeric, $2::numeric - $3::numeric, $4, NOW())
+ON CONFLICT ("user_id") DO UPDATE SET
+    "income_total" = "user_balances"."income_total" + EXCLUDED."income_total",
+    "expense_total" = "user_balances"."expense_total" + EXCLUDED."expense_total",
+    "balance" = "user_balances"."balance" + EXCLUDED."balance",
+    "row_count" = "user_balances"."row_count" + EXCLUDED."row_count",
+    "updated_at" = NOW()
+"""
+
+# Recalcula o saldo do usuário a partir das transações
+REBUILD_SQL = """
+INSERT INTO "user_balances" ("user_id", "income_total", "expense_total", "balance", "row_count", "updated_at")
+SELECT
+    $1,
+    COALESCE(SUM(ABS("amount")) FILTER (WHERE "type" = 'INCOME'), 0),
+    COALESCE(SUM(ABS("amount")) FILTER (WHERE "type" = 'EXPENSE'), 0),
+    COALESCE(SUM(ABS("amount")) FILTER (WHERE "type" = 'INCOME'), 0)
+        - COALESCE(SUM(ABS("amount")) FILTER (WHERE "type" = 'EXPENSE'), 0),
+    COUNT(*),
+    NOW()
+FROM "transactions"
+WHERE "user_id" = $1
+ON CONFLICT ("user_id") DO UPDATE SET
+    "income_total" = EXCLUDED."income_total",
+    "expense_total" = EXCLUDED."expense_total",
+    "balance" = EXCLUDED."balance",
+    "row_count" = EXCLUDED."row_count",
+    "updated_at" = NOW()
+"""
+
+# Mesma lógica de delta para o consolidado mensal por categoria
+APPLY_ROLLUP_SQL = """
+INSERT INTO "transaction_rollups" ("user_id", "month", "category", "type", "total", "count", "updated_at")
+VALUES ($1, date_trunc('month', $2::timestamptz AT TIME ZONE $7::text)::date, $3, $4, $5::numeric, $6, NOW())
+ON CONFLICT ("user_id", "month", "category", "type") DO UPDATE SET
+    "total" = "transaction_rollups"."total" + EXCLUDED."total",
+    "count" = "transaction_rollups"."count" + EXCLUDED."count",
+    "updated_at" = NOW()
+"""
+
+DELETE_ROLLUPS_SQL = """
+DELETE FROM "transaction_rollups" WHERE "user_id" = $1
+"""
+
+REBUILD_ROLLUPS_SQL = """
+INSERT INTO "transaction_rollups" ("user_id", "month", "category", "type", "total", "count", "updated_at")
+SELECT
+    "user_id",
+    date_trunc('month', "date" AT TIME ZONE $2::text)::date,
+    "category",
+    "type",
+    SUM(ABS("amount")),
+    COUNT(*),
+    NOW()
+FROM "transactions"
+WHERE "user_id" = $1
+GROUP BY 1, 2, 3, 4
+"""
+
+# Versões em lote: somam aos consolidados as transações recém-inseridas (por id)
+APPLY_BATCH_SQL = """
+INSERT INTO "user_balances" ("user_id", "income_total", "expense_total", "balance", "row_count", "updated_at")
+SELECT
+    "user_id",
+    COALESCE(SUM(ABS("amount")) FILTER (WHERE "type" = 'INCOME'), 0),
+    COALESCE(SUM(ABS("amount")) FILTER (WHERE "type" = 'EXPENSE'), 0),
+    COALESCE(SUM(ABS("amount")) FILTER (WHERE "type" = 'INCOME'), 0)
+        - COALESCE(SUM(ABS("amount")) FILTER (WHERE "type" = 'EXPENSE'), 0),
+    COUNT(*),
+    NOW()
+FROM "transactions"
+WHERE "id" = ANY($1)
+GROUP BY "user_id"
+ON CONFLICT ("user_id") DO UPDATE SET
+    "income_total" = "user_balances"."income_total" + EXCLUDED."income_total",
+    "expense_total" = "user_balances"."expense_total" + EXCLUDED."expense_total",
+    "balance" = "user_balances"."balance" + EXCLUDED."balance",
+    "row_count" = "user_balances"."row_count" + EXCLUDED."row_count",
+    "updated_at" = NOW()
+"""
+
+APPLY_ROLLUP_BATCH_SQL = """
+INSERT INTO "transaction_rollups" ("user_id", "month", "category", "type", "total", "count", "updated_at")
+SELECT
+    "user_id",
+    date_trunc('month', "date" AT TIME ZONE $2::text)::date,
+    "category",
+    "type",
+    SUM(ABS("amount")),
+    COUNT(*),
+    NOW()
+FROM "transactions"
+WHERE "id" = ANY($1)
+GROUP BY 1, 2, 3, 4
+ON CONFLICT ("user_id", "month", "category", "type") DO UPDATE SET
+    "total" = "transaction_rollups"."total" + EXCLUDED."total",
+    "count" = "transaction_rollups"."count" + EXCLUDED."count",
+    "updated_at" = NOW()
+"""
+
+
+def on_transaction_write(listener: Callable[[str], None]) -> Callable[[str], None]:
+    """Registra uma função a ser chamada com o user_id a cada escrita de transação"""
+    _write_listeners.append(listener)
+    return listener
+
+
+def notify_write(user_id: str) -> None:
+    """Avisa os listeners de que os dados financeiros do usuário mudaram"""
+    for listener in _write_listeners:
+        listener(user_id)
+
+
+def _type_value(transaction_type: Any) -> str:
+    return str(getattr(transaction_type, "value", transaction_type)).upper()
+
+
+def transaction_delta(transaction_type: Any, amount: Any, sign: int = 1) -> Tuple[Decimal, Decimal, int]:
+    """
+    Calcula o delta (receitas, despesas, quantidade) de uma transação.
+
+    O tipo define o lado do saldo; o valor é usado em módulo porque o
+    webhook grava despesas com sinal negativo e as rotas REST não.
+    """
+    value = abs(Decimal(str(amount))) * sign
+    if _type_value(transaction_type) == "INCOME":
+        return value, Decimal("0"), sign
+    return Decimal("0"), value, sign
+
+
+async def apply_transaction(db: Prisma, transaction: Any, sign: int = 1) -> None:
+    """
+    Soma (sign=1) ou remove (sign=-1) uma transação dos consolidados do
+    usuário (saldo e totais mensais por categoria).
+
+    Deve ser chamada com o cliente de uma transação (prisma.tx()) para que
+    os consolidados sejam atualizados junto com a escrita da transação.
+    Quem chama deve chamar notify_write(user_id) depois que o bloco tx()
+    terminar: invalidar antes do commit deixaria outra requisição guardar
+    em cache os totais antigos.
+    """
+    income, expense, count = transaction_delta(transaction.type, transaction.amount, sign)
+    await db.execute_raw(
+        APPLY_DELTA_SQL,
+        transaction.user_id,
+        str(income),
+        str(expense),
+        count
+    )
+    await db.execute_raw(
+        APPLY_ROLLUP_SQL,
+        transaction.user_id,
+        transaction.date,
+        transaction.category,
+        _type_value(transaction.type),
+        str(income + expense),
+        count,
+        settings.default_timezone
+    )
+
+
+async def apply_transactions(db: Prisma, user_id: str, transaction_ids: List[str]) -> None:
+    """
+    Soma aos consolidados um lote de transações já inseridas (ex.: create_many).
+
+    Deve ser chamada no mesmo prisma.tx() da inserção, com notify_write(user_id)
+    depois do commit (ver apply_transaction).
+    """
+    if not transaction_ids:
+        return
+    await db.execute_raw(APPLY_BATCH_SQL, transaction_ids)
+    await db.execute_raw(APPLY_ROLLUP_BATCH_SQL, transaction_ids, settings.default_timezone)
+
+
+async def rebuild_balance(db: Prisma, user_id: str) -> None:
+    """Recalcula o saldo consolidado do usuário a partir do histórico"""
+    await db.execute_raw(REBUILD_SQL, user_id)
+    notify_write(user_id)
+
+
+async def rebuild_rollups(db: Prisma, user_id: str) -> None:
+    """Recalcula os totais mensais por categoria do usuário a partir do histórico"""
+    async with db.tx() as tx:
+        await tx.execute_raw(DELETE_ROLLUPS_SQL, user_id)
+        await tx.execute_raw(REBUILD_ROLLUPS_SQL, user_id, settings.default_timezone)
+    notify_write(user_id)
+
+
+async def get_rollups(
+    db: Prisma,
+    user_id: str,
+    start_month: Optional[datetime] = None,
+    end_month: Optional[datetime] = None,
+    category: Optional[str] = None
+) -> List[Any]:
+    """
+    Retorna os totais mensais do usuário, do mês mais antigo ao mais recente.
+
+    Args:
+        start_month (datetime): primeiro mês incluído (dia 1)
+        end_month (datetime): primeiro mês excluído (dia 1)
+        category (str): filtra por uma categoria
+    """
+    where = {"user_id": user_id, "count": {"gt": 0}}
+    month_filter = {}
+    if start_month:
+        month_filter["gte"] = start_month
+    if end_month:
+        month_filter["lt"] = end_month
+    if month_filter:
+        where["month"] = month_filter
+    if category:
+        where["category"] = category
+    return await db.transaction_rollups.find_many(
+        where=where,
+        order={"month": "asc"}
+    )
+
+
+async def get_balance(db: Prisma, user_id: str) -> Optional[Any]:
+    """Retorna o saldo consolidado do usuário (None se não houver transações)"""
+    return await db.user_balances.find_unique(where={"user_id": user_id})
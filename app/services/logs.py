@@ -0,0 +1,165 @@
+"""
+    Esse código configura os logs da aplicação. Os módulos usam
+logging.getLogger(__name__) (loggers "app.*"); os registros vão para uma
+fila e uma thread em segundo plano grava JSON em stdout (e os erros em
+LOG_ERROR_FILE, padrão error_logs.txt), então o event loop nunca espera
+por I/O de log.
+
+Cada registro leva o id da requisição (cabeçalho X-Request-ID ou gerado
+pelo middleware). LOG_LEVEL controla o nível e LOG_SAMPLE_RATE a fração
+dos registros abaixo de WARNING que é mantida. Com o nível desligado, as
+chamadas de log não formatam nada: use argumentos (logger.debug("... %s", x))
+em vez de f-strings.
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import traceback
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from ..core.config import settings
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Atributos padrão de LogRecord; o resto (extra=...) entra no JSON
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "request_id"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """Uma linha JSON por registro (roda na thread do listener)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.request_id:
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """Guarda o id da requisição no registro (na thread de quem loga)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Mantém só `rate` dos registros abaixo de WARNING; avisos e erros passam sempre"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Enfileira o registro sem bloquear. A mensagem é montada aqui (os
+    argumentos podem mudar depois), mas o JSON é gerado no listener. Com a
+    fila cheia, o registro é descartado e contado em `dropped`.
+    """
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info))
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
+
+
+def setup_logging() -> None:
+    """Liga o logger "app" à fila e inicia o listener (só na primeira chamada)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.Queue(maxsize=settings.log_queue_size)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(ContextFilter())
+    handler.addFilter(SamplingFilter(settings.log_sample_rate))
+
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(settings.log_level.upper())
+    app_logger.addHandler(handler)
+    app_logger.propagate = False
+
+    stdout_handler = logging.StreamHandler(sys.stdout)
+    stdout_handler.setFormatter(JSONFormatter())
+    handlers = [stdout_handler]
+    if settings.log_error_file:
+        error_file_handler = logging.FileHandler(settings.log_error_file)
+        error_file_handler.setLevel(logging.ERROR)
+        error_file_handler.setFormatter(logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        ))
+        handlers.append(error_file_handler)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Esvazia a fila e para o listener (desligamento da aplicação)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestIDMiddleware:
+    """
+    Define o id da requisição para os logs e o devolve no cabeçalho
+    X-Request-ID (middleware ASGI puro, vale também durante o streaming)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("X-Request-ID") or uuid.uuid4().hex
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
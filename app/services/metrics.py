@@ -0,0 +1,263 @@
+"""
+    Esse código mantém as métricas da aplicação e as exporta no formato
+texto do Prometheus (GET /metrics): requisições e latência por rota,
+latência por tipo de comando do webhook, consultas e linhas do banco por
+requisição e latência das chamadas ao serviço do WhatsApp.
+
+As métricas são atualizadas só na thread do event loop, então não há lock:
+cada observação é uma busca em dicionário, uma bissecção nos limites do
+histograma e alguns incrementos.
+"""
+import logging
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from ..core.config import settings
+from .utils import bulkhead_stats
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+ROW_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000)
+
+_registry: List["Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, value: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + value
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [contagem por faixa (+Inf no fim), soma]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def samples(self) -> Iterator[str]:
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                le = 'le="%s"' % bound
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {total}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class CallbackGauge(Metric):
+    """Valores lidos na hora da coleta (ex.: estado dos bulkheads)"""
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Dict[Tuple[str, ...], float]]
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self.collect().items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+@contextmanager
+def track(histogram: Histogram, *labels: str) -> Iterator[None]:
+    """Mede o bloco e registra em `histogram` com o resultado ("ok" ou "error") como último label"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        histogram.observe(time.perf_counter() - start, *labels, outcome)
+
+
+class RequestStats:
+    """
+    Contadores do banco da requisição atual (preenchidos pela instrumentação
+    do Prisma). Em desenvolvimento, `operations` guarda quantas vezes cada
+    modelo.operação rodou, para o aviso de excesso de consultas.
+    """
+
+    __slots__ = ("queries", "rows", "seconds", "operations")
+
+    def __init__(self, track_operations: bool = False):
+        self.queries = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.operations: Optional[Dict[str, int]] = {} if track_operations else None
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Requisições HTTP por rota e status", ("method", "route", "status")
+)
+HTTP_DURATION = Histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP por rota", ("method", "route")
+)
+WEBHOOK_DURATION = Histogram(
+    "webhook_command_duration_seconds", "Latência do webhook por tipo de comando", ("type", "outcome")
+)
+DB_QUERIES = Counter(
+    "db_queries_total", "Consultas ao banco por modelo e operação", ("model", "operation")
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Latência das consultas ao banco por modelo e operação", ("model", "operation")
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "Consultas ao banco por requisição", ("route",), QUERY_BUCKETS
+)
+DB_ROWS_PER_REQUEST = Histogram(
+    "db_rows_per_request", "Linhas lidas ou afetadas no banco por requisição", ("route",), ROW_BUCKETS
+)
+WHATSAPP_DURATION = Histogram(
+    "whatsapp_request_duration_seconds", "Latência das chamadas ao serviço do WhatsApp", ("operation", "outcome")
+)
+
+
+def _bulkhead_gauge(field: str) -> Callable[[], Dict[Tuple[str, ...], float]]:
+    return lambda: {(name,): stats[field] for name, stats in bulkhead_stats().items()}
+
+
+CallbackGauge("bulkhead_active", "Chamadas em execução por bulkhead", ("bulkhead",), _bulkhead_gauge("active"))
+CallbackGauge("bulkhead_waiting", "Chamadas na fila por bulkhead", ("bulkhead",), _bulkhead_gauge("waiting"))
+CallbackGauge("bulkhead_rejected", "Chamadas recusadas (fila cheia) por bulkhead", ("bulkhead",), _bulkhead_gauge("rejected"))
+
+
+# Aviso de requisições com consultas demais (ex.: consulta por item em laço)
+DEV_MODE = settings.environment == "development"
+
+
+def render() -> str:
+    """Todas as métricas no formato texto do Prometheus (versão 0.0.4)"""
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+def route_label(scope: dict) -> str:
+    """Caminho da rota (ex.: /transactions/user/{user_id}), para não criar um label por id"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Conta e mede cada requisição, com as consultas e linhas do banco que ela
+    gerou. É um middleware ASGI puro: a medição termina quando o último
+    pedaço do corpo é enviado, então respostas em streaming (export NDJSON,
+    importação, SSE) são medidas por inteiro, não só até os cabeçalhos.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(track_operations=DEV_MODE)
+        token = request_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+        observed = False
+
+        def observe() -> None:
+            nonlocal observed
+            observed = True
+            elapsed = time.perf_counter() - start
+            method = scope["method"]
+            route = route_label(scope)
+            HTTP_REQUESTS.inc(method, route, str(status))
+            HTTP_DURATION.observe(elapsed, method, route)
+            DB_QUERIES_PER_REQUEST.observe(stats.queries, route)
+            DB_ROWS_PER_REQUEST.observe(stats.rows, route)
+            if DEV_MODE and stats.queries > settings.db_query_warn_threshold:
+                logger.warning(
+                    "%s %s fez %s consultas ao banco (%.1f ms): %s",
+                    method,
+                    route,
+                    stats.queries,
+                    stats.seconds * 1000,
+                    ", ".join(f"{name} x{count}" for name, count in stats.operations.items())
+                )
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                observe()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_stats.reset(token)
+            # Erro ou cliente desconectado antes do fim do corpo
+            if not observed:
+                observe()
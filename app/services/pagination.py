@@ -0,0 +1,80 @@
+"""
+    Esse código implementa a paginação por cursor (keyset) das transações,
+ordenadas por (date, id) decrescente. Cada página é uma varredura do índice
+(user_id, date) a partir do último item entregue, sem OFFSET.
+"""
+import base64
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from prisma import Prisma
+
+TRANSACTIONS_ORDER = [{"date": "desc"}, {"id": "desc"}]
+
+
+def encode_cursor(transaction: Any) -> str:
+    """Gera o cursor opaco (date, id) a partir da última transação da página"""
+    raw = f"{transaction.date.isoformat()}|{transaction.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decodifica o cursor; levanta ValueError se for inválido"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        date_value, transaction_id = raw.split("|", 1)
+        return datetime.fromisoformat(date_value), transaction_id
+    except Exception:
+        raise ValueError("Cursor inválido")
+
+
+def keyset_where(where: Dict[str, Any], cursor: Optional[str]) -> Dict[str, Any]:
+    """Acrescenta ao filtro a condição (date, id) < cursor"""
+    if not cursor:
+        return where
+    date_value, transaction_id = decode_cursor(cursor)
+    return {
+        **where,
+        "OR": [
+            {"date": {"lt": date_value}},
+            {"date": date_value, "id": {"lt": transaction_id}}
+        ]
+    }
+
+
+async def fetch_page(
+    db: Prisma,
+    where: Dict[str, Any],
+    cursor: Optional[str],
+    limit: int
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Busca uma página de transações após o cursor.
+
+    Returns:
+        Tuple[List[Any], Optional[str]]: transações da página e cursor da
+        próxima página (None quando não há mais itens)
+    """
+    rows = await db.transactions.find_many(
+        where=keyset_where(where, cursor),
+        order=TRANSACTIONS_ORDER,
+        take=limit + 1
+    )
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+async def iter_transactions(
+    db: Prisma,
+    where: Dict[str, Any],
+    batch_size: int,
+    cursor: Optional[str] = None
+) -> AsyncIterator[Any]:
+    """Percorre todas as transações do filtro em lotes, mantendo a memória constante"""
+    while True:
+        rows, cursor = await fetch_page(db, where, cursor, batch_size)
+        for row in rows:
+            yield row
+        if not cursor:
+            break
@@ -0,0 +1,74 @@
+"""
+    Esse código tira o bcrypt do event loop. O hash e a verificação de
+senha rodam em um executor próprio e pequeno (PASSWORD_HASH_WORKERS), com
+fila limitada (PASSWORD_HASH_MAX_QUEUE): quando a fila enche, a requisição
+recebe 503 na hora em vez de acumular trabalho de CPU. Também guarda os
+limites de tentativas de login e de cadastro.
+"""
+import asyncio
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from fastapi import HTTPException, status
+from ..core.config import settings
+from ..core.security import get_password_hash, verify_password
+from .rate_limit import RateLimiter
+from .utils import BulkheadFullError, get_bulkhead, run_with_timeout
+
+_executor: Optional[ThreadPoolExecutor] = None
+_bulkhead = get_bulkhead(
+    "password",
+    settings.password_hash_workers,
+    settings.password_hash_max_queue
+)
+
+# Tentativas por login (e-mail) e por IP do cliente (login + cadastro)
+login_limiter = RateLimiter(settings.login_rate_limit, settings.auth_rate_window)
+client_limiter = RateLimiter(settings.auth_ip_rate_limit, settings.auth_rate_window)
+
+
+def get_password_executor() -> ThreadPoolExecutor:
+    """Executor só do bcrypt, para não disputar threads com o resto da aplicação"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.password_hash_workers,
+            thread_name_prefix="fincontrol-bcrypt"
+        )
+    return _executor
+
+
+async def _run(func: Callable[..., Any], *args: Any) -> Any:
+    try:
+        return await run_with_timeout(
+            func,
+            *args,
+            timeout=settings.password_hash_timeout,
+            bulkhead=_bulkhead,
+            executor=get_password_executor()
+        )
+    except (BulkheadFullError, asyncio.TimeoutError):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Serviço de autenticação ocupado, tente novamente em instantes",
+            headers={"Retry-After": "1"}
+        )
+
+
+async def hash_password(password: str) -> str:
+    return await _run(get_password_hash, password)
+
+
+async def check_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run(verify_password, plain_password, hashed_password)
+
+
+def enforce_rate_limit(limiter: RateLimiter, key: str) -> None:
+    """Levanta 429 (com Retry-After) quando `key` esgotou as tentativas da janela"""
+    retry_after = limiter.hit(key)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Muitas tentativas, tente novamente mais tarde",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
@@ -0,0 +1,34 @@
+"""
+    Esse código implementa um limite de tentativas por chave (login, IP do
+cliente) em janelas fixas de tempo. Os contadores ficam em memória, no
+TTLCache, e expiram junto com a janela.
+"""
+import time
+from typing import Hashable
+from .cache import TTLCache
+
+
+class RateLimiter:
+    def __init__(self, limit: int, window: float, maxsize: int = 100000):
+        self.limit = limit
+        self.window = window
+        self._hits = TTLCache(maxsize=maxsize, ttl=window)
+
+    def hit(self, key: Hashable) -> float:
+        """
+        Registra uma tentativa para `key`.
+
+        Returns:
+            0 se a tentativa é permitida; caso contrário, os segundos até a
+            janela atual terminar (para o cabeçalho Retry-After)
+        """
+        now = time.monotonic()
+        start, count = self._hits.get(key) or (now, 0)
+        remaining = self.window - (now - start)
+        if count >= self.limit:
+            return remaining
+        self._hits.set(key, (start, count + 1), ttl=remaining)
+        return 0.0
+
+    def reset(self, key: Hashable) -> None:
+        self._hits.pop(key)
@@ -6,58 +6,185 @@ author: github.com/gustavosett
 
 import asyncio
 import datetime
+import functools
 import logging
-import queue
-import threading
-from typing import Optional
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from ..core.config import settings
+from .logs import setup_logging
 
 
 def setup_logger() -> logging.Logger:
-    """função que cria logger e salva erros em arquivo txt"""
-    logger = logging.getLogger("_logs")
-    logger.setLevel(logging.ERROR)
-    file_handler = logging.FileHandler("error_logs.txt")
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-
-    return logger
+    """função que cria logger e salva erros em arquivo txt (gravado pela thread de logs, ver logs.py)"""
+    setup_logging()
+    return logging.getLogger("app.errors")
 
 # inicia logger globalmente
 LOGGER = setup_logger()
+logger = logging.getLogger(__name__)
 
-def async_timeout(seconds: int):
+class BulkheadFullError(Exception):
+    pass
+
+
+class Bulkhead:
+    """
+    Limita quantas chamadas de um mesmo tipo rodam ao mesmo tempo (ex.: IA,
+    hash de senha), para que um recurso lento não consuma todo o processo.
+    Guarda métricas simples de uso.
+    """
+
+    def __init__(self, name: str, limit: int, max_waiting: Optional[int] = None):
+        self.name = name
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self._semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        if self.max_waiting is not None and self._semaphore.locked() and self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise BulkheadFullError(f"Limite de chamadas simultâneas atingido em '{self.name}'")
+        if self._semaphore.locked():
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise
+            finally:
+                self.waiting -= 1
+        else:
+            # Há vaga: adquire sem suspender
+            await self._semaphore.acquire()
+        self.active += 1
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "avg_ms": round(self.total_seconds / self.completed * 1000, 2) if self.completed else 0.0
+        }
+
+
+_bulkheads: Dict[str, Bulkhead] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_bulkhead(name: str, limit: Optional[int] = None, max_waiting: Optional[int] = None) -> Bulkhead:
+    """Retorna o bulkhead com esse nome, criando-o na primeira chamada"""
+    bulkhead = _bulkheads.get(name)
+    if bulkhead is None:
+        bulkhead = _bulkheads[name] = Bulkhead(
+            name, limit or settings.bulkhead_default_limit, max_waiting
+        )
+    return bulkhead
+
+
+def bulkhead_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: bulkhead.stats() for name, bulkhead in _bulkheads.items()}
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Executor compartilhado e limitado para funções síncronas (bloqueantes)"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.blocking_executor_workers,
+            thread_name_prefix="fincontrol-blocking"
+        )
+    return _executor
+
+
+async def run_with_timeout(
+    func: Callable[..., Any],
+    *args: Any,
+    timeout: Optional[float] = None,
+    bulkhead: Optional[Bulkhead] = None,
+    executor: Optional[Executor] = None,
+    **kwargs: Any
+) -> Any:
+    """
+    Executa `func` com prazo. Funções assíncronas rodam no próprio event
+    loop e são canceladas ao estourar o prazo; funções síncronas rodam em
+    `executor` (por padrão o executor compartilhado). A thread não pode ser
+    interrompida, então o lugar no bulkhead só é liberado quando ela termina.
+
+    Raises:
+        asyncio.TimeoutError: prazo esgotado (incluindo a espera no bulkhead)
+        BulkheadFullError: fila do bulkhead cheia
+    """
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    if bulkhead:
+        await bulkhead.acquire(timeout)
+    start = time.perf_counter()
+
+    def finished(failed: bool = False, timed_out: bool = False) -> None:
+        if bulkhead:
+            bulkhead.total_seconds += time.perf_counter() - start
+            bulkhead.completed += 1
+            bulkhead.failed += failed
+            bulkhead.timeouts += timed_out
+            bulkhead.release()
+
+    remaining = None if deadline is None else max(deadline - loop.time(), 0)
+    if asyncio.iscoroutinefunction(func):
+        try:
+            result = await asyncio.wait_for(func(*args, **kwargs), remaining)
+        except asyncio.TimeoutError:
+            finished(failed=True, timed_out=True)
+            logger.warning("Function %s timed out", func.__name__)
+            raise
+        except BaseException:
+            finished(failed=True)
+            raise
+        finished()
+        return result
+
+    future = loop.run_in_executor(executor or get_executor(), functools.partial(func, *args, **kwargs))
+    if bulkhead:
+        future.add_done_callback(lambda f: finished(failed=f.cancelled() or f.exception() is not None))
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), remaining)
+    except asyncio.TimeoutError:
+        if bulkhead:
+            bulkhead.timeouts += 1
+        logger.warning("Function %s timed out", func.__name__)
+        raise
+
+
+def async_timeout(seconds: Optional[float], bulkhead: Optional[str] = None, limit: Optional[int] = None):
+    """
+    Decorator: transforma `func` (síncrona ou assíncrona) em uma corrotina
+    com prazo de `seconds` e, opcionalmente, limitada pelo bulkhead `bulkhead`.
+    """
     def decorator(func):
-        def wrapper(*args, **kwargs):
-            async def async_func():
-                return await asyncio.to_thread(func, *args, **kwargs)
-
-            def thread_func(result_queue):
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    result = loop.run_until_complete(
-                        asyncio.wait_for(async_func(), timeout=seconds)
-                    )
-                    result_queue.put(result)
-                except asyncio.TimeoutError:
-                    logging.warning(f"Function {func.__name__} timed out")
-                    result_queue.put(TimeoutError())
-                except Exception as e:
-                    logging.error(f"Function {func.__name__} raised {str(e)}")
-                    result_queue.put(e)
-                finally:
-                    loop.close()
-
-            result_queue = queue.Queue()
-            threading.Thread(target=thread_func, args=(result_queue,)).start()
-            result = result_queue.get()
-
-            if isinstance(result, Exception):
-                raise result
-            return result
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await run_with_timeout(
+                func,
+                *args,
+                timeout=seconds,
+                bulkhead=get_bulkhead(bulkhead, limit) if bulkhead else None,
+                **kwargs
+            )
 
         return wrapper
     return decorator
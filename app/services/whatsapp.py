@@ -1,7 +1,11 @@
+import logging
 import httpx
 from typing import Optional, Dict, Any
 from app.core.config import settings
 from ..modules.claude import generateResponse
+from .metrics import WHATSAPP_DURATION, track
+
+logger = logging.getLogger(__name__)
 
 class WhatsAppService:
     def __init__(self, base_url: str, secret_key: str):
@@ -14,30 +18,30 @@ class WhatsAppService:
 
     async def send_message(self, to: str, message: str):
         try:
-            response = await self.client.post("/send", json={
-                "to": to,
-                "text": message
-            })
-            response.raise_for_status()
+            with track(WHATSAPP_DURATION, "send"):
+                response = await self.client.post("/send", json={
+                    "to": to,
+                    "text": message
+                })
+                response.raise_for_status()
             return response.json()
         except Exception as e:
-            print(f"Error sending message: {str(e)}")
+            logger.error("Error sending message: %s", e)
             raise
 
     async def get_qr(self):
         try:
-            print(f"Solicitando QR code de: {self.base_url}/qr")
+            logger.info("Solicitando QR code de: %s/qr", self.base_url)
             async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.get(f"{self.base_url}/qr", 
-                                           headers={"Authorization": f"Bearer {self.secret_key}"})
-                response.raise_for_status()
+                with track(WHATSAPP_DURATION, "qr"):
+                    response = await client.get(f"{self.base_url}/qr", 
+                                               headers={"Authorization": f"Bearer {self.secret_key}"})
+                    response.raise_for_status()
                 qr_data = response.json()
-                print(f"QR code recebido com sucesso, tamanho: {len(str(qr_data))}")
+                logger.info("QR code recebido com sucesso")
                 return qr_data
         except Exception as e:
-            print(f"Erro ao obter QR code: {str(e)}")
-            print(f"URL: {self.base_url}/qr")
-            print(f"Secret key: {'*' * len(self.secret_key)}")
+            logger.error("Erro ao obter QR code de %s/qr: %s", self.base_url, e)
             raise
 
     async def register_transaction(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -51,18 +55,18 @@ class WhatsAppService:
             Dict[str, Any]: Dados da transação registrada
         """
         try:
-            print(f"\n=== REGISTRANDO TRANSAÇÃO ===")
-            print(f"Dados: {data}")
+            logger.debug("Registrando transação: %s", data)
             
-            response = await self.client.post("/webhook", json=data)
-            response.raise_for_status()
+            with track(WHATSAPP_DURATION, "webhook"):
+                response = await self.client.post("/webhook", json=data)
+                response.raise_for_status()
             result = response.json()
             
-            print(f"Transação registrada com sucesso: {result}")
+            logger.debug("Transação registrada com sucesso: %s", result)
             return result
             
         except Exception as e:
-            print(f"Erro ao registrar transação: {str(e)}")
+            logger.error("Erro ao registrar transação: %s", e)
             raise
 
     async def generate_response(self, context: dict) -> str:
@@ -78,7 +82,7 @@ class WhatsAppService:
         try:
             return await generateResponse(context)
         except Exception as e:
-            print(f"Erro ao gerar resposta: {str(e)}")
+            logger.exception("Erro ao gerar resposta")
             return "Desculpe, ocorreu um erro ao gerar a resposta."
 
     async def __aenter__(self):
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from app.core.config import settings
+from app.routes.whatsapp import advice_events
+from app.services.ai_service import FinancialAdvisorService
+from app.services.metrics import WEBHOOK_DURATION
+
+CONTEXT = {
+    "message": "me dá conselhos",
+    "financialContext": {"balance": "R$ 1.000,00", "monthlyIncome": "R$ 5.000,00"},
+}
+
+
+class FakeStreamClient:
+    """Cliente falso: o stream devolve `chunks`, esperando `delay` segundos antes de cada um"""
+
+    def __init__(self, chunks, delay=0.0):
+        self.chunks = chunks
+        self.delay = delay
+        self.calls = 0
+        self.messages = SimpleNamespace(stream=self.stream)
+
+    @asynccontextmanager
+    async def stream(self, **params):
+        self.calls += 1
+
+        async def text_stream():
+            for chunk in self.chunks:
+                await asyncio.sleep(self.delay)
+                yield chunk
+
+        yield SimpleNamespace(text_stream=text_stream())
+
+
+def parse(events):
+    parsed = []
+    for event in events:
+        name, data = event.strip().split("\n")
+        parsed.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return parsed
+
+
+async def collect(context, advisor):
+    return parse([event async for event in advice_events(context, advisor)])
+
+
+async def test_events_in_order():
+    advisor = FinancialAdvisorService(client=FakeStreamClient(["💡 *Análise", "* do mês", ", continue assim."]))
+
+    events = await collect(CONTEXT, advisor)
+
+    assert [name for name, _ in events] == ["start", "token", "token", "token", "done"]
+    assert "".join(data["text"] for name, data in events if name == "token") == "💡 *Análise* do mês, continue assim."
+
+
+async def test_repeat_request_served_from_cache():
+    client = FakeStreamClient(["parte 1, ", "parte 2"])
+    advisor = FinancialAdvisorService(client=client)
+
+    await collect(CONTEXT, advisor)
+    events = await collect(CONTEXT, advisor)
+
+    assert client.calls == 1
+    assert events == [("start", {}), ("token", {"text": "parte 1, parte 2"}), ("done", {})]
+
+
+async def test_timeout_emits_error_and_releases_bulkhead(monkeypatch):
+    monkeypatch.setattr(settings, "advice_timeout", 0.1)
+    advisor = FinancialAdvisorService(client=FakeStreamClient(["lento"] * 5, delay=0.05))
+
+    events = await collect(CONTEXT, advisor)
+
+    assert [name for name, _ in events][0] == "start"
+    assert events[-1] == ("error", {"error": "Tempo esgotado ao gerar a análise financeira"})
+    assert advisor._bulkhead.active == 0
+
+
+async def test_streamed_advice_counts_in_webhook_latency():
+    labels = ("FINANCIAL_ADVICE", "ok")
+    before = sum(WEBHOOK_DURATION._values.get(labels, [[0]])[0])
+    advisor = FinancialAdvisorService(client=FakeStreamClient(["a", "b"], delay=0.05))
+
+    started = time.perf_counter()
+    events = parse([event async for event in advice_events(CONTEXT, advisor, started=started)])
+
+    assert events[-1] == ("done", {})
+    counts, total = WEBHOOK_DURATION._values[labels]
+    assert sum(counts) == before + 1
+    assert total >= 0.1
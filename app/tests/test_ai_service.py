@@ -0,0 +1,139 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from fastapi import HTTPException
+from app.core.config import settings
+from app.services.ai_service import FinancialAdvisorService
+
+FINANCIAL_CONTEXT = {
+    "balance": "R$ 1.000,00",
+    "monthlyIncome": "R$ 5.000,00",
+    "monthlyExpenses": "R$ 4.000,00",
+}
+
+
+class StubMessagesServer(ThreadingHTTPServer):
+    """Endpoint /v1/messages local: responde com o modo pedido no prompt, após `delay` segundos"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubMessagesHandler)
+        self.delay = 0.0
+        self.prompts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubMessagesHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][0]["content"]
+        with server.lock:
+            server.prompts.append(prompt)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delay)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+        text = "Dicas Práticas de Economia" if "Dicas Práticas" in prompt else "Análise Financeira"
+        payload = json.dumps({
+            "id": f"msg_{len(server.prompts)}",
+            "type": "message",
+            "role": "assistant",
+            "model": body["model"],
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 10, "output_tokens": 5},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    server = StubMessagesServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(settings, "claude_base_url", server.url)
+    monkeypatch.setattr(settings, "advice_max_retries", 0)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+async def test_same_normalized_context_hits_cache(stub_server):
+    advisor = FinancialAdvisorService()
+
+    first = await advisor.analisar_transacoes({"message": "conselhos", "financialContext": FINANCIAL_CONTEXT})
+    # Mesmo contexto com espaços diferentes e campos extras ignorados
+    second = await advisor.analisar_transacoes({
+        "message": "quero conselhos",
+        "financialContext": {**{k: f"  {v} " for k, v in FINANCIAL_CONTEXT.items()}, "extra": "ignorado"},
+    })
+
+    assert first == second == "Análise Financeira"
+    assert len(stub_server.prompts) == 1
+
+
+async def test_mode_change_misses_cache(stub_server):
+    advisor = FinancialAdvisorService()
+
+    advice = await advisor.analisar_transacoes({"message": "conselhos", "financialContext": FINANCIAL_CONTEXT})
+    tips = await advisor.analisar_transacoes({"message": "dicas", "financialContext": FINANCIAL_CONTEXT})
+
+    assert advice == "Análise Financeira"
+    assert tips == "Dicas Práticas de Economia"
+    assert len(stub_server.prompts) == 2
+
+
+async def test_timeout_returns_504(stub_server, monkeypatch):
+    monkeypatch.setattr(settings, "advice_timeout", 0.2)
+    stub_server.delay = 1.0
+    advisor = FinancialAdvisorService()
+
+    start = time.perf_counter()
+    with pytest.raises(HTTPException) as error:
+        await advisor.analisar_transacoes({"message": "conselhos", "financialContext": FINANCIAL_CONTEXT})
+
+    assert error.value.status_code == 504
+    assert time.perf_counter() - start < 0.9
+    assert advisor._bulkhead.active == 0
+
+
+async def test_bulkhead_limits_concurrent_calls(stub_server):
+    stub_server.delay = 0.1
+    advisor = FinancialAdvisorService()
+    limit = advisor._bulkhead.limit
+
+    # Contextos diferentes: nenhum vem do cache nem é agrupado no single-flight
+    results = await asyncio.gather(*(
+        advisor.analisar_transacoes({
+            "message": "conselhos",
+            "financialContext": {**FINANCIAL_CONTEXT, "balance": f"R$ {i},00"},
+        })
+        for i in range(limit * 3)
+    ))
+
+    assert len(results) == limit * 3
+    assert len(stub_server.prompts) == limit * 3
+    assert stub_server.max_in_flight == limit
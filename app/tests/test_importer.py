@@ -0,0 +1,51 @@
+import json
+import tempfile
+from types import SimpleNamespace
+import httpx
+import pytest
+from app.main import app
+from app.utils.prisma import get_prisma
+
+
+class FakePrisma:
+    """Só o necessário para uma importação sem linhas válidas"""
+
+    def __init__(self):
+        self.categories = SimpleNamespace(find_many=self.find_many)
+
+    async def find_many(self, **kwargs):
+        return []
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    app.dependency_overrides[get_prisma] = FakePrisma
+    yield httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    app.dependency_overrides.clear()
+
+
+async def post_csv(client, content: bytes):
+    async with client:
+        response = await client.post(
+            "/transactions/import",
+            files={"file": ("extrato.csv", content, "text/csv")},
+            headers={"user-id": "u1"},
+        )
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+async def test_invalid_rows_are_reported_and_temp_file_removed(client, tmp_path):
+    events = await post_csv(client, b"data;valor\n2024-13-01;10,00\n01/02/2024;abc\n")
+
+    assert [event["event"] for event in events] == ["error", "error", "done"]
+    assert events[-1] == {"event": "done", "processed": 2, "inserted": 0, "errors": 2}
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_temp_file_removed_when_parsing_fails(client, tmp_path):
+    events = await post_csv(client, b"descricao\nmercado\n")
+
+    assert events[-1]["event"] == "failed"
+    assert "Colunas obrigatórias ausentes" in events[-1]["error"]
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,23 @@
+import pytest
+from app.db.instrumentation import row_count
+
+
+@pytest.mark.parametrize(
+    "result, method, expected",
+    [
+        ([{"id": "1"}, {"id": "2"}], "find_many", 2),
+        ({"id": "1"}, "find_unique", 1),
+        (None, "find_first", 0),
+        ({"columns": ["id"], "types": ["string"], "rows": [["1"], ["2"], ["3"]]}, "query_raw", 3),
+        (7, "execute_raw", 7),
+        ({"count": 40}, "create_many", 40),
+        ({"count": 0}, "delete_many", 0),
+        ({"_count": {"_all": 120}}, "count", 0),
+    ],
+)
+def test_row_count(result, method, expected):
+    assert row_count({"data": {"result": result}}, method) == expected
+
+
+def test_row_count_without_response():
+    assert row_count(None, "find_many") == 0
@@ -0,0 +1,38 @@
+import asyncio
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from app.services.logs import RequestIDMiddleware
+from app.services.metrics import HTTP_DURATION, HTTP_REQUESTS, MetricsMiddleware
+
+
+def build_app():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(RequestIDMiddleware)
+
+    @app.get("/slow-stream/{item_id}")
+    async def slow_stream(item_id: str):
+        async def body():
+            for _ in range(3):
+                await asyncio.sleep(0.1)
+                yield b"x\n"
+
+        return StreamingResponse(body(), media_type="application/x-ndjson")
+
+    return app
+
+
+async def test_streaming_response_is_timed_until_last_chunk():
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/slow-stream/42", headers={"X-Request-ID": "abc123"})
+
+    assert response.text == "x\n" * 3
+    assert response.headers["X-Request-ID"] == "abc123"
+
+    labels = ("GET", "/slow-stream/{item_id}")
+    counts, total = HTTP_DURATION._values[labels]
+    assert sum(counts) == 1
+    assert total >= 0.3
+    assert HTTP_REQUESTS._values[labels + ("200",)] == 1
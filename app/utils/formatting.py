@@ -0,0 +1,87 @@
+"""
+    Esse código formata valores e datas no padrão brasileiro (R$ 1.234,56,
+DD/MM/AAAA e Outubro/2026) para as mensagens do bot e o contexto da IA. Os valores são
+convertidos para centavos inteiros antes de formatar, e as funções *_many
+formatam uma coluna inteira (extratos, relatórios) de uma vez.
+"""
+from datetime import date
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import Any, Iterable, List
+
+# Nomes dos meses em português, indexados pelo número do mês (sem usar locale)
+MONTH_NAMES = (
+    "", "Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
+    "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"
+)
+
+_CENT = Decimal("0.01")
+
+
+def to_cents(value: Any) -> int:
+    """
+    Converte Decimal, float, int ou str em centavos inteiros.
+
+    O arredondamento é o mesmo do format(valor, ".2f") usado antes: o float
+    é convertido para o Decimal exato do seu valor binário e arredondado uma
+    única vez (meio para o par). round(valor * 100) arredondaria duas vezes
+    (1.115 * 100 vira 111.5 e daria 1,12, enquanto o formato antigo dá 1,11).
+    """
+    if isinstance(value, int):
+        return value * 100
+    if isinstance(value, float):
+        value = Decimal(value)
+    elif not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return int(value.quantize(_CENT, ROUND_HALF_EVEN) * 100)
+
+
+def format_cents(cents: int) -> str:
+    """Formata centavos inteiros como 1.234,56 (sem o símbolo da moeda)"""
+    sign = "-" if cents < 0 else ""
+    reais, centavos = divmod(abs(cents), 100)
+    if reais < 1000:
+        return f"{sign}{reais},{centavos:02d}"
+    return f"{sign}{f'{reais:_}'.replace('_', '.')},{centavos:02d}"
+
+
+def format_brl(value: Any, symbol: bool = False) -> str:
+    """Formata o valor como 1.234,56 (ou R$ 1.234,56 com symbol=True)"""
+    cents = to_cents(value)
+    if not symbol:
+        return format_cents(cents)
+    return "-R$ " + format_cents(-cents) if cents < 0 else "R$ " + format_cents(cents)
+
+
+def format_brl_many(values: Iterable[Any], symbol: bool = False) -> List[str]:
+    """Formata uma coluna de valores de uma vez (extratos e relatórios)"""
+    prefix, negative = ("R$ ", "-R$ ") if symbol else ("", "-")
+    result = []
+    append = result.append
+    for value in values:
+        cents = round(value * 100) if isinstance(value, Decimal) else to_cents(value)
+        if cents < 0:
+            reais, centavos = divmod(-cents, 100)
+            sign = negative
+        else:
+            reais, centavos = divmod(cents, 100)
+            sign = prefix
+        if reais < 1000:
+            append(f"{sign}{reais},{centavos:02d}")
+        else:
+            append(f"{sign}{f'{reais:_}'.replace('_', '.')},{centavos:02d}")
+    return result
+
+
+def format_date(value: date) -> str:
+    """Formata a data como DD/MM/AAAA (sem depender do locale do processo)"""
+    return f"{value.day:02d}/{value.month:02d}/{value.year}"
+
+
+def format_dates(values: Iterable[date]) -> List[str]:
+    """Formata uma coluna de datas de uma vez"""
+    return [f"{value.day:02d}/{value.month:02d}/{value.year}" for value in values]
+
+
+def format_month(value: date) -> str:
+    """Formata o mês como Outubro/2026"""
+    return f"{MONTH_NAMES[value.month]}/{value.year}"
@@ -0,0 +1,109 @@
+"""
+    Esse código calcula os intervalos de data dos relatórios (diário,
+semanal, mensal e anual) no fuso do usuário. Todos os intervalos são
+semiabertos [início, fim), para que as consultas usem o índice
+(user_id, date) com os dois limites, e os objetos de fuso são criados uma
+única vez por nome.
+"""
+from datetime import datetime, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from ..core.config import settings
+from ..db.models import PeriodType
+
+# Usado se a base de fusos (tzdata) não estiver instalada na imagem.
+# O Brasil não tem horário de verão desde 2019, então UTC-3 é exato.
+_FALLBACK_OFFSETS = {
+    "America/Sao_Paulo": timezone(timedelta(hours=-3)),
+    "UTC": timezone.utc,
+}
+
+PERIOD_NAMES = {
+    PeriodType.DAILY: "Diário",
+    PeriodType.WEEKLY: "Semanal",
+    PeriodType.MONTHLY: "Mensal",
+    PeriodType.YEARLY: "Anual"
+}
+
+
+class Period(NamedTuple):
+    start: datetime
+    end: datetime
+
+
+@lru_cache(maxsize=64)
+def get_timezone(name: Optional[str] = None) -> tzinfo:
+    """Retorna o fuso pelo nome IANA (padrão: DEFAULT_TIMEZONE), em cache"""
+    name = name or settings.default_timezone
+    try:
+        return ZoneInfo(name)
+    except ZoneInfoNotFoundError:
+        if name in _FALLBACK_OFFSETS:
+            return _FALLBACK_OFFSETS[name]
+        raise ValueError(f"Fuso horário desconhecido: '{name}'")
+
+
+def local_now(tz: Optional[str] = None) -> datetime:
+    """Data/hora atual no fuso informado"""
+    return datetime.now(get_timezone(tz))
+
+
+def _next_month(year: int, month: int) -> Tuple[int, int]:
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def period_range(
+    period: PeriodType,
+    tz: Optional[str] = None,
+    reference: Optional[datetime] = None
+) -> Period:
+    """
+    Retorna o intervalo [início, fim) do período que contém `reference`
+    (padrão: agora), com limites à meia-noite no fuso informado.
+
+    A semana vai de segunda-feira a domingo.
+    """
+    zone = get_timezone(tz)
+    now = reference.astimezone(zone) if reference else datetime.now(zone)
+    day = datetime(now.year, now.month, now.day, tzinfo=zone)
+
+    if period == PeriodType.DAILY:
+        return Period(day, day + timedelta(days=1))
+    if period == PeriodType.WEEKLY:
+        start = day - timedelta(days=now.weekday())
+        return Period(start, start + timedelta(days=7))
+    if period == PeriodType.MONTHLY:
+        return month_range(now.year, now.month, tz)
+    if period == PeriodType.YEARLY:
+        return Period(
+            datetime(now.year, 1, 1, tzinfo=zone),
+            datetime(now.year + 1, 1, 1, tzinfo=zone)
+        )
+    raise ValueError(f"Período inválido: {period}")
+
+
+def month_range(year: int, month: int, tz: Optional[str] = None) -> Period:
+    """Intervalo [dia 1, dia 1 do mês seguinte) do mês informado"""
+    zone = get_timezone(tz)
+    next_year, next_month = _next_month(year, month)
+    return Period(
+        datetime(year, month, 1, tzinfo=zone),
+        datetime(next_year, next_month, 1, tzinfo=zone)
+    )
+
+
+def covers_whole_months(period: PeriodType) -> bool:
+    """Indica se o período pode ser lido dos consolidados mensais"""
+    return period in (PeriodType.MONTHLY, PeriodType.YEARLY)
+
+
+def rollup_months(period: Period) -> Tuple[datetime, datetime]:
+    """
+    Converte um intervalo de meses inteiros nos limites da coluna
+    transaction_rollups.month (datas sem fuso, já no fuso de São Paulo).
+    """
+    return (
+        datetime(period.start.year, period.start.month, 1),
+        datetime(period.end.year, period.end.month, 1)
+    )
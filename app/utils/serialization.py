@@ -0,0 +1,44 @@
+"""
+    Esse código serializa as respostas da API com orjson. Decimal vira
+string (mesmo formato que o pydantic usava, ex.: "50.00"); UUID, Enum e
+datetime com fuso são tratados pelo próprio orjson. As listas grandes
+(transações, usuários) montam os dicionários direto das linhas do Prisma,
+sem passar pela validação do pydantic.
+"""
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Sequence
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# Sem OPT_UTC_Z: datetime sai como isoformat() ("+00:00"), igual aos
+# json_encoders dos schemas e às rotas que ainda passam pelo pydantic
+OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Tipo não serializável: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=OPTIONS)
+
+
+def to_row(row: Any, fields: Sequence[str]) -> Dict[str, Any]:
+    """Converte uma linha do Prisma em dicionário só com `fields` (ex.: campos do schema de saída)"""
+    return {field: getattr(row, field, None) for field in fields}
+
+
+def to_rows(rows: Iterable[Any], fields: Sequence[str]) -> List[Dict[str, Any]]:
+    return [to_row(row, fields) for row in rows]
+
+
+class ORJSONResponse(JSONResponse):
+    """Resposta padrão da aplicação (ver FastAPI(default_response_class=...))"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,27 @@
+-- CreateTable
+CREATE TABLE "user_balances" (
+    "user_id" TEXT NOT NULL,
+    "income_total" DECIMAL(14,2) NOT NULL DEFAULT 0,
+    "expense_total" DECIMAL(14,2) NOT NULL DEFAULT 0,
+    "balance" DECIMAL(14,2) NOT NULL DEFAULT 0,
+    "row_count" INTEGER NOT NULL DEFAULT 0,
+    "updated_at" TIMESTAMPTZ(6) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "user_balances_pkey" PRIMARY KEY ("user_id")
+);
+
+-- AddForeignKey
+ALTER TABLE "user_balances" ADD CONSTRAINT "user_balances_user_id_fkey" FOREIGN KEY ("user_id") REFERENCES "users"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+
+-- Backfill: consolida o histórico existente (despesas podem estar gravadas com sinal negativo)
+INSERT INTO "user_balances" ("user_id", "income_total", "expense_total", "balance", "row_count", "updated_at")
+SELECT
+    "user_id",
+    COALESCE(SUM(ABS("amount")) FILTER (WHERE "type" = 'INCOME'), 0),
+    COALESCE(SUM(ABS("amount")) FILTER (WHERE "type" = 'EXPENSE'), 0),
+    COALESCE(SUM(ABS("amount")) FILTER (WHERE "type" = 'INCOME'), 0)
+        - COALESCE(SUM(ABS("amount")) FILTER (WHERE "type" = 'EXPENSE'), 0),
+    COUNT(*),
+    CURRENT_TIMESTAMP
+FROM "transactions"
+GROUP BY "user_id";
@@ -0,0 +1,35 @@
+-- CreateTable
+CREATE TABLE "transaction_rollups" (
+    "user_id" TEXT NOT NULL,
+    "month" DATE NOT NULL,
+    "category" TEXT NOT NULL,
+    "type" TEXT NOT NULL,
+    "total" DECIMAL(14,2) NOT NULL DEFAULT 0,
+    "count" INTEGER NOT NULL DEFAULT 0,
+    "updated_at" TIMESTAMPTZ(6) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "transaction_rollups_pkey" PRIMARY KEY ("user_id","month","category","type")
+);
+
+-- CreateIndex
+CREATE INDEX "transaction_rollups_user_id_category_idx" ON "transaction_rollups"("user_id", "category");
+
+-- AddForeignKey
+ALTER TABLE "transaction_rollups" ADD CONSTRAINT "transaction_rollups_user_id_fkey" FOREIGN KEY ("user_id") REFERENCES "users"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+
+-- Backfill: meses no fuso de São Paulo, valores em módulo.
+-- As escritas seguintes usam DEFAULT_TIMEZONE (app/services/ledger.py). Em
+-- instalações com outro fuso, rode scripts/rebuild_rollups.py logo após esta
+-- migração (e sempre que DEFAULT_TIMEZONE mudar), senão os meses antigos e
+-- os novos ficam em fusos diferentes.
+INSERT INTO "transaction_rollups" ("user_id", "month", "category", "type", "total", "count", "updated_at")
+SELECT
+    "user_id",
+    date_trunc('month', "date" AT TIME ZONE 'America/Sao_Paulo')::date,
+    "category",
+    "type",
+    SUM(ABS("amount")),
+    COUNT(*),
+    CURRENT_TIMESTAMP
+FROM "transactions"
+GROUP BY 1, 2, 3, 4;
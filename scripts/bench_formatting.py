@@ -0,0 +1,93 @@
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils.formatting import format_brl, format_brl_many, format_dates
+
+
+def legacy(amounts, dates):
+    """Formatação antiga: float + três replace() por valor e strftime por data"""
+    valores = [
+        f"R$ {abs(float(amount)):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        for amount in amounts
+    ]
+    datas = [date.strftime("%d/%m/%Y") for date in dates]
+    return valores, datas
+
+
+def per_row(amounts, dates):
+    """Módulo de formatação, chamado linha a linha"""
+    valores = [format_brl(abs(amount), True) for amount in amounts]
+    datas = [f"{date.day:02d}/{date.month:02d}/{date.year}" for date in dates]
+    return valores, datas
+
+
+def batch(amounts, dates):
+    """Módulo de formatação, coluna inteira de uma vez"""
+    return format_brl_many((abs(amount) for amount in amounts), symbol=True), format_dates(dates)
+
+
+def legacy_brl(value):
+    """Formatador antigo sobre o próprio valor (float ou Decimal, sem conversão)"""
+    return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def parity(rows: int) -> int:
+    """
+    Compara format_brl com o formatador antigo em floats (incluindo empates
+    de meio centavo como 1.115 e 2.675) e Decimals; devolve as divergências.
+    """
+    random.seed(7)
+    samples = [0.005, 0.015, 0.125, 1.115, 2.675, 1.005, 10.555, 1234.565, 999999.995]
+    samples += [random.randint(0, 10_000_000) / 1000 for _ in range(rows)]
+    samples += [random.uniform(0, 100000) for _ in range(rows)]
+    samples += [Decimal(random.randint(0, 10_000_000)) / 1000 for _ in range(rows)]
+
+    expected = [legacy_brl(value) for value in samples]
+    mismatches = 0
+    per_row_values = [format_brl(value, True) for value in samples]
+    for value, old, new, many in zip(samples, expected, per_row_values, format_brl_many(samples, True)):
+        if old != new or old != many:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"Divergência em {value!r}: legado {old}, por linha {new}, lote {many}")
+    print(f"Paridade com o legado: {len(samples) - mismatches}/{len(samples)} valores iguais\n")
+    return mismatches
+
+
+def bench(rows: int, rounds: int) -> None:
+    random.seed(42)
+    start_date = datetime(2024, 1, 1)
+    amounts = [Decimal(random.randint(-500000, 500000)) / 100 for _ in range(rows)]
+    dates = [start_date + timedelta(days=random.randint(0, 1000)) for _ in range(rows)]
+
+    print(f"Extrato com {rows} linhas, melhor de {rounds} rodadas\n")
+    print(f"{'método':<10} {'ms/extrato':>12} {'linhas/s':>14}")
+    reference = None
+    for name, fn in (("legado", legacy), ("por linha", per_row), ("lote", batch)):
+        best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            result = fn(amounts, dates)
+            best = min(best, time.perf_counter() - start)
+        if reference is None:
+            reference = result
+        elif result != reference:
+            print(f"Aviso: '{name}' gerou saída diferente do legado")
+        print(f"{name:<10} {best * 1000:>12.2f} {rows / best:>14,.0f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ("-h", "--help"):
+        print("Uso: python scripts/bench_formatting.py [linhas] [rodadas]")
+        sys.exit(0)
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    mismatches = parity(rows)
+    bench(rows, int(sys.argv[2]) if len(sys.argv) > 2 else 5)
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.modules.claude import RENDERERS, render
+
+# Contextos representativos de cada tipo de resposta enviada pelo webhook
+CONTEXTS = {
+    "INCOME": {"type": "INCOME", "step": "CONFIRMATION", "amount": 1500.0,
+               "description": "salário", "category": "Salário", "date": "05/10/2026"},
+    "EXPENSE": {"type": "EXPENSE", "step": "CONFIRMATION", "amount": 50.0,
+                "description": "almoço", "category": "Alimentação", "date": "05/10/2026"},
+    "BALANCE": {"type": "BALANCE", "balance": 1234.56, "status_emoji": "✅", "status": "Positivo",
+                "total_receitas": 4500.0, "total_despesas": 3265.44},
+    "STATEMENT": {"type": "STATEMENT", "total_receitas": 4500.0, "total_despesas": 3265.44, "saldo": 1234.56,
+                  "transactions_list": "\n".join(f"📉 05/10 • R$ {i},00 • almoço" for i in range(10)),
+                  "has_more": True, "page_size": 10},
+    "REPORT": {"type": "REPORT", "period_name": "Mensal", "receitas": 4500.0, "num_receitas": 2,
+               "despesas": 3265.44, "num_despesas": 37, "saldo_emoji": "↗", "saldo": 1234.56,
+               "media_receitas": 2250.0, "media_despesas": 88.25,
+               "lista_categorias": "• Alimentação: R$ 1.200,00\n• Transporte: R$ 450,00"},
+    "WEEKLY_REPORT": {"type": "WEEKLY_REPORT", "receitas": 1500.0, "despesas": 820.3, "saldo": 679.7,
+                      "media_receita": 1500.0, "media_despesa": 41.0, "total_receitas": 1, "total_despesas": 20,
+                      "top_categorias": [{"name": f"Categoria {i}", "amount": 100.0 * i, "count": i}
+                                         for i in range(1, 6)]},
+    "CATEGORY_REPORT": {"type": "CATEGORY_REPORT", "category": "Alimentação", "total": 14500.75,
+                        "media": 45.3, "ultima": 32.9, "meses_list": "📅 Outubro/2026: R$ 1.200,00\n"},
+    "EDIT": {"type": "EDIT", "tipo": "despesa", "valor": 75.5, "description": "jantar", "category": "Alimentação"},
+    "HELP_DETAILS": {"type": "HELP_DETAILS", "command": "extrato"},
+    "HELP_MESSAGE": {"type": "HELP_MESSAGE"},
+}
+
+
+def bench(iterations: int) -> None:
+    """Mede quantas mensagens por segundo cada renderizador produz"""
+    print(f"{len(RENDERERS)} tipos registrados, {iterations} renderizações por tipo\n")
+    print(f"{'tipo':<20} {'msgs/s':>12} {'µs/msg':>10}")
+    for response_type, context in CONTEXTS.items():
+        render(context)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            render(context)
+        elapsed = time.perf_counter() - start
+        print(f"{response_type:<20} {iterations / elapsed:>12,.0f} {elapsed / iterations * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ("-h", "--help"):
+        print("Uso: python scripts/bench_renderers.py [iterações]")
+        sys.exit(0)
+
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,86 @@
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pydantic import TypeAdapter
+
+from app.schemas.transactions import TransactionOut
+from app.utils.serialization import dumps, to_rows
+
+TRANSACTION_FIELDS = tuple(TransactionOut.model_fields)
+ADAPTER = TypeAdapter(list[TransactionOut])
+SAO_PAULO = timezone(timedelta(hours=-3))
+
+
+def fake_rows(rows: int):
+    """Linhas no formato do Prisma (Decimal, datetime com fuso UTC e -03:00, com microssegundos)"""
+    random.seed(42)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    user_id = str(uuid.uuid4())
+    return [
+        SimpleNamespace(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            amount=Decimal(random.randint(1, 500000)) / 100,
+            description=random.choice([None, "Mercado", "Salário", "Aluguel", "Restaurante"]),
+            category=random.choice(["alimentação", "moradia", "renda", "lazer"]),
+            type=random.choice(["INCOME", "EXPENSE"]),
+            date=(start + timedelta(minutes=random.randint(0, 10 ** 6), microseconds=random.randint(0, 999999))).astimezone(SAO_PAULO),
+            created_at=start,
+            updated_at=start,
+            bankAccountId=None,
+            categoryId=None,
+            accountId=None
+        )
+        for _ in range(rows)
+    ]
+
+
+def legacy(rows) -> bytes:
+    """Caminho antigo: response_model valida cada linha no pydantic e o JSONResponse usa json.dumps"""
+    content = ADAPTER.dump_python(ADAPTER.validate_python(rows, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def direct(rows) -> bytes:
+    """Caminho novo: dicionários direto das linhas + orjson"""
+    return dumps(to_rows(rows, TRANSACTION_FIELDS))
+
+
+def bench(rows: int, rounds: int) -> None:
+    data = fake_rows(rows)
+    print(f"Listagem de {rows} transações, melhor de {rounds} rodadas\n")
+    print(f"{'método':<18} {'ms/resposta':>12} {'respostas/s':>12}")
+
+    reference = None
+    for name, fn in (("pydantic + json", legacy), ("linhas + orjson", direct)):
+        best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            body = fn(data)
+            best = min(best, time.perf_counter() - start)
+        # Os bytes precisam ser iguais (inclusive o formato das datas, ex.: +00:00)
+        if reference is None:
+            reference = body
+        elif body != reference:
+            sys.exit(f"Erro: '{name}' gerou JSON diferente do caminho antigo")
+        print(f"{name:<18} {best * 1000:>12.2f} {1 / best:>12.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ("-h", "--help"):
+        print("Uso: python scripts/bench_serialization.py [linhas] [rodadas]")
+        sys.exit(0)
+
+    bench(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    )
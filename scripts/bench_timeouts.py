@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.utils import get_bulkhead, get_executor, run_with_timeout
+
+
+def legacy_async_timeout(seconds: int):
+    """Implementação antiga: uma thread e um event loop novos por chamada"""
+    def decorator(func):
+        def wrapper(*args, **kwargs):
+            async def async_func():
+                return await asyncio.to_thread(func, *args, **kwargs)
+
+            def thread_func(result_queue):
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                try:
+                    result = loop.run_until_complete(
+                        asyncio.wait_for(async_func(), timeout=seconds)
+                    )
+                    result_queue.put(result)
+                except asyncio.TimeoutError:
+                    logging.warning(f"Function {func.__name__} timed out")
+                    result_queue.put(TimeoutError())
+                except Exception as e:
+                    logging.error(f"Function {func.__name__} raised {str(e)}")
+                    result_queue.put(e)
+                finally:
+                    loop.close()
+
+            result_queue = queue.Queue()
+            threading.Thread(target=thread_func, args=(result_queue,)).start()
+            result = result_queue.get()
+
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        return wrapper
+    return decorator
+
+
+def blocking_work(delay: float) -> float:
+    time.sleep(delay)
+    return delay
+
+
+async def async_work(delay: float) -> float:
+    await asyncio.sleep(delay)
+    return delay
+
+
+class ThreadSampler:
+    """Registra o maior número de threads vivas durante a medição"""
+
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, threading.active_count())
+            time.sleep(0.001)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def bench_legacy(calls: int, delay: float):
+    wrapped = legacy_async_timeout(5)(blocking_work)
+    # O decorator antigo bloqueia quem chama: cada chamada simultânea precisa da própria thread
+    callers = [threading.Thread(target=wrapped, args=(delay,)) for _ in range(calls)]
+    with ThreadSampler() as sampler:
+        start = time.perf_counter()
+        for caller in callers:
+            caller.start()
+        for caller in callers:
+            caller.join()
+        elapsed = time.perf_counter() - start
+    return elapsed, sampler.peak
+
+
+def bench_new(calls: int, delay: float, func, limit: int):
+    async def main():
+        bulkhead = get_bulkhead(f"bench-{func.__name__}", limit)
+        await asyncio.gather(*(
+            run_with_timeout(func, delay, timeout=60, bulkhead=bulkhead) for _ in range(calls)
+        ))
+        return bulkhead.stats()
+
+    get_executor()
+    with ThreadSampler() as sampler:
+        start = time.perf_counter()
+        stats = asyncio.run(main())
+        elapsed = time.perf_counter() - start
+    return elapsed, sampler.peak, stats
+
+
+def bench(calls: int, delay: float, limit: int) -> None:
+    print(f"{calls} chamadas simultâneas de {delay * 1000:.0f} ms (bulkhead de {limit})\n")
+    print(f"{'implementação':<28} {'tempo (s)':>10} {'pico de threads':>16} {'overhead/chamada':>18}")
+
+    def row(name, elapsed, peak, ideal):
+        overhead = max(elapsed - ideal, 0) / calls * 1e6
+        print(f"{name:<28} {elapsed:>10.2f} {peak:>16} {overhead:>15.0f} µs")
+
+    elapsed, peak = bench_legacy(calls, delay)
+    row("legado (thread por chamada)", elapsed, peak, delay)
+
+    workers = get_executor()._max_workers
+    elapsed, peak, _ = bench_new(calls, delay, blocking_work, limit)
+    row("novo, função síncrona", elapsed, peak, delay * -(-calls // min(limit, workers)))
+
+    elapsed, peak, stats = bench_new(calls, delay, async_work, limit)
+    row("novo, função assíncrona", elapsed, peak, delay * -(-calls // limit))
+    print(f"\nMétricas do bulkhead (assíncrona): {stats}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ("-h", "--help"):
+        print("Uso: python scripts/bench_timeouts.py [chamadas] [atraso_ms] [limite_bulkhead]")
+        sys.exit(0)
+
+    bench(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        (float(sys.argv[2]) if len(sys.argv) > 2 else 20) / 1000,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    )
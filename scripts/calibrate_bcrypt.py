@@ -0,0 +1,51 @@
+import statistics
+import sys
+import time
+
+from passlib.hash import bcrypt
+
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+
+def measure(rounds: int, samples: int) -> float:
+    """Mediana do tempo de hash (em ms) com esse custo"""
+    hasher = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibracao-bcrypt")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, samples: int) -> int:
+    """
+    Maior custo cujo hash fica dentro de `target_ms` neste host (nunca
+    abaixo de MIN_ROUNDS). Cada custo a mais dobra o tempo, então a busca
+    para no primeiro que passa do alvo.
+    """
+    print(f"Alvo: {target_ms:.0f} ms por hash ({samples} amostras por custo)\n")
+    print(f"{'custo':>5} {'ms/hash':>10} {'hashes/s por worker':>20}")
+
+    chosen = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed = measure(rounds, samples)
+        print(f"{rounds:>5} {elapsed:>10.1f} {1000 / elapsed:>20.1f}")
+        if elapsed > target_ms:
+            break
+        chosen = rounds
+    return chosen
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ("-h", "--help"):
+        print("Uso: python scripts/calibrate_bcrypt.py [alvo_ms] [amostras]")
+        sys.exit(0)
+
+    rounds = calibrate(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 250,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    )
+    print(f"\nCusto recomendado: BCRYPT_ROUNDS={rounds}")
+    print("Hashes existentes continuam válidos; o novo custo vale para senhas novas.")
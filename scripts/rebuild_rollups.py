@@ -0,0 +1,36 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from prisma import Prisma
+from app.services.ledger import rebuild_balance, rebuild_rollups
+
+
+async def rebuild(user_ids):
+    """
+    Recalcula os consolidados (saldo e totais mensais por categoria) a partir
+    das transações. Sem argumentos, recalcula todos os usuários.
+    """
+    prisma = Prisma()
+    await prisma.connect()
+    try:
+        if not user_ids:
+            users = await prisma.users.find_many()
+            user_ids = [user.id for user in users]
+
+        for index, user_id in enumerate(user_ids, start=1):
+            await rebuild_balance(prisma, user_id)
+            await rebuild_rollups(prisma, user_id)
+            print(f"[{index}/{len(user_ids)}] Consolidados recalculados para {user_id}")
+    finally:
+        await prisma.disconnect()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ("-h", "--help"):
+        print("Uso: python scripts/rebuild_rollups.py [user_id ...]")
+        sys.exit(0)
+
+    asyncio.run(rebuild(sys.argv[1:]))